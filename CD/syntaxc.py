@@ -1,79 +1,898 @@
-import tkinter as tk
-from tkinter import filedialog, scrolledtext
+try:
+    import tkinter as tk
+    from tkinter import filedialog, scrolledtext
+except ImportError:
+    # Batch mode runs without Tk.
+    tk = filedialog = scrolledtext = None
+from collections import OrderedDict, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import argparse
+import hashlib
+import json
+import queue
+import re
+import shlex
+import shutil
 import subprocess
+import sys
+import tempfile
+import threading
+import time
 import os
 
-def check_c_syntax():
-    code = text_area.get("1.0", tk.END)
+JSON_DIAGNOSTICS = "-fdiagnostics-format=json"
+GCC_ARGS = ["gcc", "-Wall", "-Wextra", "-Werror", "-fsyntax-only", JSON_DIAGNOSTICS]
+# Live check waits for this long a pause in typing before running gcc.
+DEBOUNCE_MS = 500
+POLL_MS = 50
+# Files are read on a worker thread in chunks of this many characters and
+# inserted for at most LOAD_SLICE_MS per Tk tick.
+LOAD_CHUNK_CHARS = 256 * 1024
+LOAD_SLICE_MS = 20
+LOAD_POLL_MS = 10
+# Results of earlier checks, keyed by source text and gcc command line.
+CACHE_MAX_ENTRIES = 500
+CACHE_MAX_BYTES = 4 * 1024 * 1024
+# Set to None to keep the cache for this session only.
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "syntaxc", "results.json")
+# Precompiled headers for the leading #include block live here, one
+# directory per include set (None turns them off).
+PCH_DIR = os.path.join(os.path.expanduser("~"), ".cache", "syntaxc", "pch")
+PCH_MAX_ENTRIES = 20
+# Blocks that preprocess to less than this are checked without a header:
+# loading a .gch costs about as much as parsing them (a lone <stdio.h> is
+# ~18 KB and gains nothing; from ~45 KB checks get 1.4x faster and more).
+PCH_MIN_BYTES = 32 * 1024
+# gcc's name for source read from stdin; cached diagnostics use it for the
+# checked file whatever it was called.
+STDIN_NAME = "<stdin>"
+# Editor line highlight for each diagnostic severity (notes get none).
+HIGHLIGHT_TAGS = {"fatal error": "diag_error", "error": "diag_error", "warning": "diag_warning"}
 
-    # Save code to a temporary file
-    tmp_file = "temp_check.c"
-    with open(tmp_file, "w", encoding="utf-8") as f:
-        f.write(code)
+Diagnostic = namedtuple("Diagnostic", "file line column severity message")
 
-    try:
-        # Run gcc with syntax-only check and strict warnings treated as errors
-        result = subprocess.run(
-            ["gcc", "-Wall", "-Wextra", "-Werror", "-fsyntax-only", tmp_file],
-            capture_output=True, text=True
-        )
+# gcc's plain-text diagnostics, for lines it prints outside the JSON and
+# for compilers without -fdiagnostics-format=json.  Messages about the
+# command line ("gcc: error: ...") have no line number.
+DIAGNOSTIC_LINE = re.compile(r"^(?P<file>[^:]+):(?:(?P<line>\d+):(?:(?P<column>\d+):)?)? "
+                             r"(?P<severity>fatal error|error|warning|note): (?P<message>.*)$")
+
+def parse_diagnostics(stderr):
+    """Turns gcc's stderr into a list of Diagnostic records."""
+    records = []
+
+    def add(item):
+        caret = item["locations"][0].get("caret", {}) if item.get("locations") else {}
+        message = item["message"] + (f" [{item['option']}]" if item.get("option") else "")
+        records.append(Diagnostic(caret.get("file", ""), caret.get("line", 0), caret.get("column", 0),
+                                  item["kind"], message))
+        for child in item.get("children", []):
+            add(child)
+
+    text = stderr.lstrip()
+    if text.startswith("["):
+        try:
+            items, end = json.JSONDecoder().raw_decode(text)
+        except ValueError:
+            items = None
+        if items is not None:
+            for item in items:
+                add(item)
+            text = text[end:]
+    for line in text.splitlines():
+        match = DIAGNOSTIC_LINE.match(line)
+        if match:
+            records.append(Diagnostic(match["file"], int(match["line"] or 0), int(match["column"] or 0),
+                                      match["severity"], match["message"]))
+    if not records:
+        # Output in no known format (a crashed or foreign compiler) is kept
+        # as it is, so a failed check never shows an empty error list.
+        records = [Diagnostic("", 0, 0, "error", line) for line in text.splitlines() if line.strip()]
+    return records
+
+def format_diagnostics(records, name):
+    lines = []
+    for d in records:
+        file = name if d.file == STDIN_NAME else d.file
+        if d.line > 0:
+            file += f":{d.line}:{d.column}"
+        lines.append(f"{file}: {d.severity}: {d.message}\n" if file else f"{d.severity}: {d.message}\n")
+    return "".join(lines)
+
+class GccRun:
+    """One gcc process checking a snapshot of the editor text.
+
+    The text goes to gcc on stdin (``-x c -``), so nothing touches the disk.
+    A helper thread feeds it and collects the diagnostics, since writing a
+    large buffer into the pipe could block; poll() returns None until gcc
+    has exited.
+    """
+    def __init__(self, code, argv=None, key=None):
+        if argv is None:
+            argv = gcc_args()
+        self.key = key
+        self.stderr = ""
+        self.proc = subprocess.Popen(argv + ["-x", "c", "-"], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                     stderr=subprocess.PIPE, text=True, encoding="utf-8", errors="replace")
+        self.thread = threading.Thread(target=self._communicate, args=(code,), daemon=True)
+        self.thread.start()
+
+    def _communicate(self, code):
+        try:
+            self.stderr = self.proc.communicate(code)[1]
+        except (OSError, ValueError):
+            pass  # killed by cancel()
+
+    def poll(self):
+        """Returns ``(returncode, diagnostics)`` once gcc has finished, else None."""
+        if self.thread.is_alive():
+            return None
+        return self.proc.returncode, parse_diagnostics(self.stderr)
+
+    def cancel(self):
+        if self.proc.poll() is None:
+            self.proc.kill()
+        self.thread.join()
+
+class ShadowBuffer:
+    """Python copy of the editor text, kept as a list of lines.
+
+    install_shadow() feeds it every insert and delete the Text widget
+    performs, with positions already resolved to (line, column), so a check
+    can take the text without serialising the widget.  An edit costs the
+    length of the lines it touches.
+    """
+    def __init__(self):
+        self.lines = [""]
+        self._text = ""
+
+    def text(self):
+        if self._text is None:
+            self._text = "\n".join(self.lines)
+        return self._text
+
+    def clamp(self, line, col):
+        # Like Tk, positions past the end mean the end of the last line.
+        if line > len(self.lines):
+            return len(self.lines), len(self.lines[-1])
+        return line, min(col, len(self.lines[line - 1]))
+
+    def insert(self, line, col, chars):
+        if not chars:
+            return
+        current = self.lines[line - 1]
+        new = (current[:col] + chars + current[col:]).split("\n")
+        self.lines[line - 1:line] = new
+        self._text = None
+
+    def delete(self, start, end):
+        (l1, c1), (l2, c2) = start, end
+        if (l2, c2) <= (l1, c1):
+            return
+        self.lines[l1 - 1:l2] = [self.lines[l1 - 1][:c1] + self.lines[l2 - 1][c2:]]
+        self._text = None
+
+def install_shadow(widget, shadow):
+    """Routes the Tk command of Text ``widget`` through a proxy that
+    mirrors inserts and deletes (including undo/redo, which Tk performs
+    through the same command) into ``shadow``."""
+    interp = widget.tk
+    original = widget._w + "_unshadowed"
+    interp.call("rename", widget._w, original)
+
+    def index(i):
+        line, col = str(interp.call(original, "index", i)).split(".")
+        return shadow.clamp(int(line), int(col))
+
+    def proxy(*args):
+        op = args[0] if args else ""
+        if op in ("insert", "delete", "replace") and str(interp.call(original, "cget", "-state")) == "disabled":
+            return interp.call((original,) + args)  # Tk ignores edits while disabled
+        if op == "insert" and len(args) >= 3:
+            at = index(args[1])
+            result = interp.call((original,) + args)
+            shadow.insert(*at, "".join(args[2::2]))
+            return result
+        if op == "delete" and len(args) in (2, 3):
+            start = index(args[1])
+            end = index(args[2]) if len(args) == 3 else index(f"{args[1]}+1c")
+            result = interp.call((original,) + args)
+            shadow.delete(start, end)
+            return result
+        if op == "replace" and len(args) >= 4:
+            start, end = index(args[1]), index(args[2])
+            result = interp.call((original,) + args)
+            shadow.delete(start, end)
+            shadow.insert(*start, "".join(args[3::2]))
+            return result
+        result = interp.call((original,) + args)
+        if op in ("delete", "replace"):
+            # Multi-range forms are rare enough to resynchronise in full.
+            shadow.lines = str(interp.call(original, "get", "1.0", "end-1c")).split("\n")
+            shadow._text = None
+        return result
+
+    interp.createcommand(widget._w, proxy)
+
+class FileLoader:
+    """Reads a file on a worker thread into a bounded queue of chunks.
+
+    The queue ends with "" at end of file, or with the OSError that stopped
+    the read.  cancel() makes the thread stop at its next chunk.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.chunks = queue.Queue(maxsize=8)
+        self.cancelled = False
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _put(self, item):
+        while not self.cancelled:
+            try:
+                self.chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                while not self.cancelled:
+                    chunk = f.read(LOAD_CHUNK_CHARS)
+                    self._put(chunk)
+                    if not chunk:
+                        return
+        except OSError as e:
+            self._put(e)
+
+    def cancel(self):
+        self.cancelled = True
+
+class ResultCache:
+    """LRU of ``key -> (returncode, diagnostics)`` bounded by entry count
+    and by the approximate bytes held in keys and diagnostics.  Diagnostics
+    are kept as plain lists so the cache saves as JSON."""
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _size(key, value):
+        return len(key) + sum(len(d[0]) + len(d[4]) + 64 for d in value[1]) + 64
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if key in self.entries:
+            self.bytes -= self._size(key, self.entries.pop(key))
+        size = self._size(key, value)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = value
+        self.bytes += size
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            old_key, old_value = self.entries.popitem(last=False)
+            self.bytes -= self._size(old_key, old_value)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def load(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for key, returncode, diagnostics in json.load(f):
+                    self.put(key, (returncode, [list(d) for d in diagnostics]))
+        except (OSError, ValueError, TypeError):
+            pass  # no cache yet, or an unreadable one: start empty
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump([[key, value[0], value[1]] for key, value in self.entries.items()], f)
+        os.replace(tmp_path, path)
+
+_compiler_id = None
+
+def compiler_id():
+    # Path, modification time and version of gcc, so an upgraded compiler
+    # does not reuse results or headers cached from the old one.
+    global _compiler_id
+    if _compiler_id is None:
+        path = shutil.which(GCC_ARGS[0]) or GCC_ARGS[0]
+        try:
+            version = subprocess.run([path, "-dumpfullversion", "-dumpversion"], stdin=subprocess.DEVNULL,
+                                     capture_output=True, text=True).stdout.strip()
+            _compiler_id = f"{path}:{os.path.getmtime(path)}:{version}"
+        except OSError:
+            _compiler_id = path
+    return _compiler_id
+
+_gcc_args = None
+
+def gcc_args():
+    # GCC_ARGS, less the JSON diagnostics flag when the compiler rejects it
+    # (gcc before 9, clang installed as gcc); the text parser covers those.
+    global _gcc_args
+    if _gcc_args is None:
+        try:
+            probe = subprocess.run([GCC_ARGS[0], "-fsyntax-only", JSON_DIAGNOSTICS, "-x", "c", "-"], input="",
+                                   capture_output=True, text=True)
+            supported = probe.returncode == 0
+        except OSError:
+            supported = True
+        _gcc_args = GCC_ARGS if supported else [arg for arg in GCC_ARGS if arg != JSON_DIAGNOSTICS]
+    return _gcc_args
+
+QUOTED_INCLUDE = re.compile(r'^[ \t]*#[ \t]*include[ \t]*"([^"]+)"', re.M)
+
+def header_mtimes(code, base_dir):
+    # Modification times of the "local.h" headers ``code`` includes from
+    # ``base_dir``, so keys change when one is edited.  Headers those
+    # include in turn are not followed.
+    mtimes = []
+    if base_dir:
+        for match in QUOTED_INCLUDE.finditer(code):
+            try:
+                mtimes.append(str(os.path.getmtime(os.path.join(base_dir, match.group(1)))))
+            except OSError:
+                pass
+    return mtimes
+
+def cache_key(code, argv=None, base_dir=None):
+    if argv is None:
+        argv = gcc_args()
+    digest = hashlib.sha256()
+    for part in [compiler_id()] + argv + header_mtimes(code, base_dir):
+        digest.update(part.encode("utf-8") + b"\0")
+    digest.update(code.encode("utf-8"))
+    return digest.hexdigest()
+
+# ----------- Precompiled headers -----------
+INCLUDE_LINE = re.compile(r'^\s*#\s*include\s*([<"])([^>"]+)[>"]\s*(//.*|/\*.*\*/\s*)?$')
+BLANK_OR_COMMENT = re.compile(r"^\s*(//.*|/\*.*\*/\s*)?$")
+# Flags that only affect the check itself, not how headers are compiled.
+CHECK_ONLY_FLAGS = {"-fsyntax-only", "-fdiagnostics-format=json"}
 
-        output_area.config(state=tk.NORMAL)
-        output_area.delete("1.0", tk.END)
+def split_includes(code):
+    """Splits off the leading block of #include, blank and one-line comment
+    lines.  Returns ``(block, body)``, where ``body`` has the block's lines
+    blanked so line numbers are unchanged; block is "" without includes."""
+    lines = code.split("\n")
+    count = 0
+    has_include = False
+    for line in lines:
+        if INCLUDE_LINE.match(line):
+            has_include = True
+        elif not BLANK_OR_COMMENT.match(line):
+            break
+        count += 1
+    if not has_include:
+        return "", code
+    return "\n".join(lines[:count]) + "\n", "\n" * count + "\n".join(lines[count:])
 
-        if result.returncode == 0:
-            # Green text for success
-            output_area.insert(tk.END, "✅ No syntax errors found\n", "success")
-        else:
-            # Red text for errors
-            output_area.insert(tk.END, "❌ Syntax errors:\n", "error")
-            output_area.insert(tk.END, result.stderr, "error")
+class PchCache:
+    """Precompiled headers for include blocks, built in the background.
 
-        output_area.config(state=tk.DISABLED)
+    The header for a block is keyed by the compiler, the flags, the block
+    text and the modification times of its quoted includes, so changing
+    any of them builds a new one.  The first check of a new block runs
+    without it while gcc preprocesses the block and, if the result is at
+    least PCH_MIN_BYTES, builds the .gch; later checks pass ``-include``
+    and gcc loads the precompiled state instead of parsing the headers.
+    Smaller blocks get a "small" marker instead and are always checked
+    without a header.  Builds that fail are not retried, and the checks
+    keep working without a header.
+    """
+    def __init__(self, directory=PCH_DIR, max_entries=PCH_MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.building = {}
+        self.failed = set()
 
+    def _key(self, block, argv, base_dir):
+        digest = hashlib.sha256()
+        for part in [compiler_id()] + argv + [block] + header_mtimes(block, base_dir):
+            digest.update(part.encode("utf-8") + b"\0")
+        return digest.hexdigest()[:32]
+
+    def _reap(self):
+        # Every finished build (header, "small" marker or failure) has made
+        # a directory, so the cache is pruned after any of them.
+        finished = False
+        for key, (proc, header, build_argv) in list(self.building.items()):
+            if proc.poll() is None:
+                continue
+            del self.building[key]
+            if proc.returncode != 0:
+                self.failed.add(key)
+                finished = True
+            elif os.path.exists(header + ".i"):
+                small = os.path.getsize(header + ".i") < PCH_MIN_BYTES
+                os.remove(header + ".i")
+                if small:
+                    open(os.path.join(os.path.dirname(header), "small"), "w").close()
+                    finished = True
+                else:
+                    self._start(key, header, build_argv, ["-o", header + ".gch.tmp"])
+            else:
+                os.replace(header + ".gch.tmp", header + ".gch")
+                finished = True
+        if finished:
+            self._prune()
+
+    def _prune(self):
+        entries = [os.path.join(self.directory, name) for name in os.listdir(self.directory)]
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:-self.max_entries]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _start(self, key, header, build_argv, output_args):
+        try:
+            proc = subprocess.Popen(build_argv + ["-x", "c-header", header] + output_args,
+                                    stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError:
+            self.failed.add(key)
+            return
+        self.building[key] = (proc, header, build_argv)
+
+    def _build(self, key, block, argv, header):
+        # Preprocesses the block first; _reap decides whether to compile it.
+        os.makedirs(os.path.dirname(header), mode=0o700, exist_ok=True)
+        with open(header, "w", encoding="utf-8") as f:
+            f.write(block)
+        build_argv = [arg for arg in argv if arg not in CHECK_ONLY_FLAGS]
+        self._start(key, header, build_argv, ["-E", "-o", header + ".i"])
+
+    def prepare(self, code, argv, base_dir=None, wait=False):
+        """Returns the ``(argv, code)`` to check ``code`` with: using the
+        precompiled header when it is ready, else unchanged (starting a
+        build if needed).  ``wait`` blocks until the build finishes."""
+        if self.directory is None:
+            return argv, code
+        block, body = split_includes(code)
+        if not block:
+            return argv, code
+        self._reap()
+        key = self._key(block, argv, base_dir)
+        header = os.path.join(self.directory, key, "prefix.h")
+        small = os.path.join(self.directory, key, "small")
+        if not os.path.exists(header + ".gch") and key not in self.failed and not os.path.exists(small):
+            if key not in self.building:
+                try:
+                    self._build(key, block, argv, header)
+                except OSError:
+                    self.failed.add(key)
+                    return argv, code
+            if not wait:
+                return argv, code
+            while key in self.building:
+                self.building[key][0].wait()
+                self._reap()
+        if key in self.failed or os.path.exists(small):
+            return argv, code
+        os.utime(os.path.dirname(header))  # most recently used, for pruning
+        return argv + ["-include", header], body
+
+    def close(self):
+        for proc, _, _ in self.building.values():
+            if proc.poll() is None:
+                proc.kill()
+        self.building.clear()
+
+def benchmark_pch(path, repeat=20, argv=None):
+    """Median seconds to check ``path`` from stdin without and with its
+    precompiled header, built first in a temporary directory."""
+    if argv is None:
+        argv = gcc_args()
+    with open(path, "r", encoding="utf-8") as f:
+        code = f.read()
+    base_dir = os.path.dirname(os.path.abspath(path))
+    argv = argv + ["-iquote", base_dir]
+    with tempfile.TemporaryDirectory() as directory:
+        pch_cache = PchCache(directory)
+        variants = [(argv, code), pch_cache.prepare(code, argv, base_dir, wait=True)]
+        medians = []
+        for run_argv, run_code in variants:
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                subprocess.run(run_argv + ["-x", "c", "-"], input=run_code, capture_output=True, text=True)
+                times.append(time.perf_counter() - start)
+            medians.append(sorted(times)[len(times) // 2])
+        used = variants[1][0] is not argv
+    return medians[0], medians[1], used
+
+cache = ResultCache()
+pch = PchCache()
+shadow = ShadowBuffer()
+current_file = None
+current_run = None
+pending_check = None
+loader = None
+
+def display_name():
+    return os.path.basename(current_file) if current_file else "untitled.c"
+
+def show_output(text, tag):
+    output_area.config(state=tk.NORMAL)
+    output_area.delete("1.0", tk.END)
+    output_area.insert(tk.END, text, tag)
+    output_area.config(state=tk.DISABLED)
+
+def cancel_run():
+    global current_run
+    if current_run is not None:
+        current_run.cancel()
+        current_run = None
+
+def update_status(text=None):
+    if text is None:
+        text = "Live check on" if live_var.get() else ""
+    lookups = cache.hits + cache.misses
+    if lookups:
+        text += f"    cache: {cache.hits}/{lookups} hits ({cache.hit_rate():.0%})"
+    status_label.config(text=text.strip())
+
+def highlight_lines(records):
+    # Tags the editor lines that have errors or warnings.  Only lines whose
+    # highlight changed are touched: existing tag ranges (which follow the
+    # text as it is edited) are compared with the new set.
+    wanted = {}
+    for d in records:
+        tag = HIGHLIGHT_TAGS.get(d.severity)
+        if tag and d.file == STDIN_NAME and d.line > 0 and wanted.get(d.line) != "diag_error":
+            wanted[d.line] = tag
+    for tag in ("diag_error", "diag_warning"):
+        lines = {line for line, t in wanted.items() if t == tag}
+        ranges = text_area.tag_ranges(tag)
+        tagged = set()
+        for start, end in zip(ranges[::2], ranges[1::2]):
+            line = int(str(start).split(".")[0])
+            if line in lines and line not in tagged:
+                tagged.add(line)
+            else:
+                text_area.tag_remove(tag, start, end)
+        for line in lines - tagged:
+            text_area.tag_add(tag, f"{line}.0", f"{line}.0 lineend")
+
+def show_result(returncode, diagnostics):
+    records = [Diagnostic(*d) for d in diagnostics]
+    highlight_lines(records)
+    if returncode == 0:
+        # Green text for success
+        show_output("✅ No syntax errors found\n", "success")
+    else:
+        # Red text for errors
+        show_output("❌ Syntax errors:\n" + format_diagnostics(records, display_name()), "error")
+
+def check_argv():
+    # Lets quoted #includes resolve next to the opened file.
+    if current_file:
+        return gcc_args() + ["-iquote", os.path.dirname(os.path.abspath(current_file))]
+    return gcc_args()
+
+def check_c_syntax():
+    # Answers from the cache when this text was checked before; otherwise
+    # starts gcc and returns at once, and poll_run shows the result.  A run
+    # still going for older text is killed first.
+    global current_run, pending_check
+    if pending_check is not None:
+        root.after_cancel(pending_check)
+        pending_check = None
+    cancel_run()
+    if loader is not None:
+        return  # checked when loading finishes
+    code = shadow.text()
+    argv = check_argv()
+    base_dir = os.path.dirname(os.path.abspath(current_file)) if current_file else None
+    key = cache_key(code, argv, base_dir)
+    result = cache.get(key)
+    if result is not None:
+        update_status()
+        show_result(*result)
+        return
+    run_argv, run_code = pch.prepare(code, argv, base_dir)
+    try:
+        current_run = GccRun(run_code, run_argv, key)
     except FileNotFoundError:
-        output_area.config(state=tk.NORMAL)
-        output_area.delete("1.0", tk.END)
-        output_area.insert(tk.END, "❌ GCC compiler not found! Please install GCC and add it to PATH.\n", "error")
-        output_area.config(state=tk.DISABLED)
-    finally:
-        if os.path.exists(tmp_file):
-            os.remove(tmp_file)
+        update_status()
+        show_output("❌ GCC compiler not found! Please install GCC and add it to PATH.\n", "error")
+        return
+    update_status("Checking...")
+    root.after(POLL_MS, poll_run, current_run)
+
+def poll_run(run):
+    global current_run
+    if run is not current_run:
+        return  # cancelled by newer text
+    result = run.poll()
+    if result is None:
+        root.after(POLL_MS, poll_run, run)
+        return
+    current_run = None
+    returncode, records = result
+    cache.put(run.key, (returncode, [list(d) for d in records]))
+    update_status()
+    show_result(returncode, records)
+
+def text_changed(event=None):
+    # Runs on every edit, so it only re-arms the event, drops the stale run
+    # and restarts the debounce timer; the check takes the shadow copy of
+    # the text after the pause.  Resetting the modified flag fires
+    # <<Modified>> again, which the first check ignores.
+    global pending_check
+    if not text_area.edit_modified():
+        return
+    text_area.edit_modified(False)
+    cancel_run()
+    if not live_var.get() or loader is not None:
+        return
+    if pending_check is not None:
+        root.after_cancel(pending_check)
+    pending_check = root.after(DEBOUNCE_MS, check_c_syntax)
+
+def toggle_live():
+    if live_var.get():
+        check_c_syntax()
+    else:
+        update_status()
 
 def open_file():
+    global current_file
     filepath = filedialog.askopenfilename(
         filetypes=[("C Files", "*.c"), ("All Files", "*.*")]
     )
     if filepath:
-        with open(filepath, "r", encoding="utf-8") as f:
-            text_area.delete("1.0", tk.END)
-            text_area.insert(tk.END, f.read())
+        start_loading(filepath)
+
+def cancel_loading():
+    global loader
+    if loader is not None:
+        loader.cancel()
+        loader = None
+        text_area.config(state=tk.NORMAL)
+
+def start_loading(path):
+    # The editor is read-only while chunks arrive; poll_loader inserts them
+    # a slice at a time so the window keeps responding.
+    global loader, current_file, pending_check
+    cancel_loading()
+    cancel_run()
+    if pending_check is not None:
+        root.after_cancel(pending_check)
+        pending_check = None
+    current_file = path
+    text_area.delete("1.0", tk.END)
+    text_area.config(state=tk.DISABLED)
+    loader = FileLoader(path)
+    update_status(f"Loading {display_name()}...")
+    root.after(LOAD_POLL_MS, poll_loader, loader)
+
+def poll_loader(current):
+    global loader
+    if current is not loader:
+        return  # cancelled
+    text_area.config(state=tk.NORMAL)
+    deadline = time.perf_counter() + LOAD_SLICE_MS / 1000
+    while time.perf_counter() < deadline:
+        try:
+            chunk = current.chunks.get_nowait()
+        except queue.Empty:
+            break
+        if isinstance(chunk, OSError):
+            loader = None
+            update_status()
+            show_output(f"❌ Could not read {current.path}: {chunk}\n", "error")
+            return
+        if not chunk:
+            loader = None
+            text_area.edit_reset()
+            text_area.mark_set(tk.INSERT, "1.0")
+            update_status()
+            if live_var.get():
+                check_c_syntax()
+            return
+        text_area.insert("end-1c", chunk)
+    text_area.config(state=tk.DISABLED)
+    root.after(LOAD_POLL_MS, poll_loader, current)
+
+def close():
+    cancel_loading()
+    cancel_run()
+    pch.close()
+    if CACHE_PATH is not None:
+        try:
+            cache.save(CACHE_PATH)
+        except OSError:
+            pass
+    root.destroy()
+
+# ----------- Batch mode -----------
+def iter_sources(paths):
+    """Yields the .c files under ``paths`` (files are passed through),
+    walking directories lazily in sorted order and skipping hidden ones."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = sorted(name for name in dirnames if not name.startswith("."))
+            for name in sorted(filenames):
+                if name.endswith(".c"):
+                    yield os.path.join(dirpath, name)
+
+def check_file(path, argv=None):
+    # gcc reads the file where it is, so relative #includes resolve and no
+    # two checks share a temporary file.
+    if argv is None:
+        argv = gcc_args()
+    start = time.perf_counter()
+    result = subprocess.run(argv + [path], stdin=subprocess.DEVNULL, capture_output=True, text=True,
+                            encoding="utf-8", errors="replace")
+    return result.returncode, parse_diagnostics(result.stderr), time.perf_counter() - start
+
+def _record(path, returncode, diagnostics, seconds, cached):
+    return {"file": path, "ok": returncode == 0, "returncode": returncode,
+            "diagnostics": [d._asdict() for d in diagnostics], "seconds": round(seconds, 4), "cached": cached}
+
+def _rename(diagnostics, old, new):
+    return [d._replace(file=new) if d.file == old else d for d in diagnostics]
+
+def run_batch(paths, jobs=None, argv=None, out=sys.stdout, result_cache=None):
+    """Checks every .c file under ``paths`` with up to ``jobs`` gcc
+    processes at once and writes one JSON line per file to ``out`` as each
+    finishes.  Returns ``(files, failures)``.
+
+    Files are fed to the pool a few at a time per worker, so huge trees do
+    not queue up in memory.  With ``result_cache`` (a ResultCache) unchanged
+    files are answered from it without running gcc.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if argv is None:
+        argv = gcc_args()
+    files = failures = 0
+    pending = {}
+
+    def emit(path, result, cached):
+        nonlocal files, failures
+        files += 1
+        failures += result[0] != 0
+        out.write(json.dumps(_record(path, *result, cached)) + "\n")
+        out.flush()
+
+    def collect(futures):
+        for future in futures:
+            path, key = pending.pop(future)
+            result = future.result()
+            if result_cache is not None and key is not None:
+                result_cache.put(key, (result[0], [list(d) for d in _rename(result[1], path, STDIN_NAME)]))
+            emit(path, result, False)
+
+    with ThreadPoolExecutor(jobs) as pool:
+        for path in iter_sources(paths):
+            key = None
+            if result_cache is not None:
+                try:
+                    # Quoted #includes resolve next to the file, so its
+                    # directory and their mtimes are part of the key, as in
+                    # the editor.
+                    base_dir = os.path.dirname(os.path.abspath(path))
+                    with open(path, "r", encoding="utf-8") as f:
+                        key = cache_key(f.read(), argv + ["-iquote", base_dir], base_dir)
+                except (OSError, UnicodeDecodeError):
+                    pass
+                hit = result_cache.get(key) if key is not None else None
+                if hit is not None:
+                    diagnostics = _rename([Diagnostic(*d) for d in hit[1]], STDIN_NAME, path)
+                    emit(path, (hit[0], diagnostics, 0.0), True)
+                    continue
+            while len(pending) >= jobs * 4:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending[pool.submit(check_file, path, argv)] = (path, key)
+        collect(list(pending))
+    return files, failures
+
+def main_batch(argv=None):
+    parser = argparse.ArgumentParser(description="Check C files with gcc -fsyntax-only. "
+                                     "With no paths the editor window opens.")
+    parser.add_argument("paths", nargs="*", help=".c files or directories to check recursively")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="parallel gcc processes (default: CPU count)")
+    parser.add_argument("--cflags", default="", help="extra gcc flags, e.g. \"-Iinclude -DNDEBUG\"")
+    parser.add_argument("--cache", action="store_true", help="reuse and update the editor's result cache")
+    parser.add_argument("--bench-pch", action="store_true",
+                        help="time editor checks of the given files without and with a precompiled header")
+    args = parser.parse_args(argv)
+    if not args.paths:
+        return None
+    if shutil.which(GCC_ARGS[0]) is None:
+        print("GCC compiler not found! Please install GCC and add it to PATH.", file=sys.stderr)
+        return 2
+    if args.bench_pch:
+        print("file                            plain ms    pch ms  speedup")
+        for path in iter_sources(args.paths):
+            plain, with_pch, used = benchmark_pch(path, argv=gcc_args() + shlex.split(args.cflags))
+            with open(path, "r", encoding="utf-8") as f:
+                has_block = bool(split_includes(f.read())[0])
+            if used:
+                print(f"{path:30s} {plain * 1000:9.1f} {with_pch * 1000:9.1f} {plain / with_pch:7.2f}x")
+            else:
+                note = f"include block under {PCH_MIN_BYTES // 1024} KB" if has_block else "no #include block"
+                print(f"{path:30s} {plain * 1000:9.1f} {'-':>9s} {'-':>8s}  ({note}, no header used)")
+        return 0
+    result_cache = None
+    if args.cache and CACHE_PATH is not None:
+        result_cache = ResultCache()
+        result_cache.load(CACHE_PATH)
+    start = time.perf_counter()
+    files, failures = run_batch(args.paths, args.jobs, gcc_args() + shlex.split(args.cflags), sys.stdout, result_cache)
+    if result_cache is not None:
+        result_cache.save(CACHE_PATH)
+    print(f"{files} files, {failures} with errors, {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 1 if failures else 0
+
+# ----------- GUI -----------
+def build_gui():
+    global root, text_area, output_area, status_label, live_var
+    if CACHE_PATH is not None:
+        cache.load(CACHE_PATH)
+
+    root = tk.Tk()
+    root.title("C Syntax Checker")
+    root.geometry("800x600")
+    root.protocol("WM_DELETE_WINDOW", close)
+
+    # Buttons
+    frame = tk.Frame(root)
+    frame.pack(pady=10)
+
+    open_btn = tk.Button(frame, text="📂 Open C File", command=open_file)
+    open_btn.pack(side=tk.LEFT, padx=5)
+
+    check_btn = tk.Button(frame, text="✅ Check Syntax", command=check_c_syntax)
+    check_btn.pack(side=tk.LEFT, padx=5)
 
-# GUI Setup
-root = tk.Tk()
-root.title("C Syntax Checker")
-root.geometry("800x600")
+    live_var = tk.BooleanVar(value=True)
+    live_btn = tk.Checkbutton(frame, text="Live check", variable=live_var, command=toggle_live)
+    live_btn.pack(side=tk.LEFT, padx=5)
 
-# Buttons
-frame = tk.Frame(root)
-frame.pack(pady=10)
+    # Text area for C code
+    text_area = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=100, height=25)
+    text_area.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+    text_area.bind("<<Modified>>", text_changed)
+    install_shadow(text_area, shadow)
 
-open_btn = tk.Button(frame, text="📂 Open C File", command=open_file)
-open_btn.pack(side=tk.LEFT, padx=5)
+    # Output area for errors
+    output_area = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=100, height=10, state=tk.DISABLED)
+    output_area.pack(padx=10, pady=5, fill=tk.BOTH)
 
-check_btn = tk.Button(frame, text="✅ Check Syntax", command=check_c_syntax)
-check_btn.pack(side=tk.LEFT, padx=5)
+    status_label = tk.Label(root, text="Live check on", anchor="w")
+    status_label.pack(fill=tk.X, padx=10)
 
-# Text area for C code
-text_area = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=100, height=25)
-text_area.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+    # Configure tags for colors
+    output_area.tag_config("success", foreground="green")
+    output_area.tag_config("error", foreground="red")
+    text_area.tag_config("diag_error", background="#ffd6d6")
+    text_area.tag_config("diag_warning", background="#fff3c4")
 
-# Output area for errors
-output_area = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=100, height=10, state=tk.DISABLED)
-output_area.pack(padx=10, pady=5, fill=tk.BOTH)
 
-# Configure tags for colors
-output_area.tag_config("success", foreground="green")
-output_area.tag_config("error", foreground="red")
 
-root.mainloop()
+if __name__ == "__main__":
+    status = main_batch()
+    if status is not None:
+        sys.exit(status)
+    build_gui()
+    root.mainloop()
@@ -0,0 +1,110 @@
+import threading
+
+# Runs AI searches on a worker thread so the Tk event loop keeps drawing and
+# handling clicks while the engine thinks, and ponders on the human's time.
+# Tk is not thread-safe, so the workers never touch widgets: the Tk thread
+# polls them with ``after`` or collects their results when the human moves.
+
+POLL_MS = 50
+
+class BackgroundSearch:
+    """
+    Runs ``fn(*args)`` on a daemon thread and hands the result back on the
+    Tk thread.
+
+    While the search runs, ``on_tick()`` is called every POLL_MS so the GUI
+    can refresh a "thinking" indicator; when it finishes, ``on_done(result)``
+    is called.  cancel() stops the polling and calls ``stop()`` so the search
+    can bail out early; a cancelled search never reports its result.
+    """
+
+    def __init__(self, master, fn, args, on_done, on_tick=None, stop=None):
+        self.master = master
+        self.fn = fn
+        self.args = args
+        self.on_done = on_done
+        self.on_tick = on_tick
+        self.stop = stop
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self._after_id = master.after(POLL_MS, self._poll)
+
+    def _run(self):
+        try:
+            self.result = self.fn(*self.args)
+        except BaseException as exc:
+            self.error = exc
+
+    def _poll(self):
+        self._after_id = None
+        if self.cancelled:
+            return
+        if self.thread.is_alive():
+            if self.on_tick is not None:
+                self.on_tick()
+            self._after_id = self.master.after(POLL_MS, self._poll)
+            return
+        if self.error is not None:
+            raise self.error
+        self.on_done(self.result)
+
+    def cancel(self):
+        """
+        Abandons the search.  Safe to call more than once or after it finished.
+        """
+        self.cancelled = True
+        if self._after_id is not None:
+            self.master.after_cancel(self._after_id)
+            self._after_id = None
+        if self.stop is not None:
+            self.stop()
+
+class Ponder:
+    """
+    Searches the positions the human may reach while they think.
+
+    ``tasks`` is a list of ``(key, fn, args)``, likeliest first; they run in
+    order on a daemon thread and ``results[key]`` is set to ``fn(*args)`` as
+    each one finishes.  stop() calls ``stop()`` to cut the running search
+    short and waits for the thread, so the caller may search with the same
+    tables afterwards; a search cut short is not recorded.  The wait is on
+    the Tk thread, so every ``fn`` must notice ``stop()`` within a node or
+    playout (including any endgame solve it runs).  The thread never
+    touches widgets.
+    """
+
+    def __init__(self, tasks, stop=None):
+        self.tasks = tasks
+        self.stop_search = stop
+        self.results = {}
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        for key, fn, args in self.tasks:
+            if self.stopped:
+                return
+            try:
+                result = fn(*args)
+            except Exception:
+                if self.stopped:
+                    return
+                raise
+            if self.stopped:
+                return
+            self.results[key] = result
+
+    def stop(self):
+        """
+        Stops pondering and returns the finished results.  Safe to call more
+        than once.
+        """
+        self.stopped = True
+        if self.stop_search is not None:
+            self.stop_search()
+        self.thread.join()
+        return self.results
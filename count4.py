@@ -1,7 +1,20 @@
-import tkinter as tk
-from tkinter import messagebox
+import argparse
+import array
 import math
+import mmap
+import os
 import random
+import struct
+import sys
+import time
+try:
+    import tkinter as tk
+    from tkinter import messagebox
+except ImportError:
+    # Headless installs only use the engine (see tournament.py).
+    tk = messagebox = None
+
+from background_search import BackgroundSearch, Ponder
 
 ROWS = 6
 COLS = 7
@@ -9,44 +22,253 @@ PLAYER = 1
 AI = 2
 EMPTY = 0
 WINDOW_LENGTH = 4
-MAX_DEPTH = 4
+MAX_DEPTH = 6
+AI_TIME_LIMIT = 0.5
+# Positions with this many empty cells or fewer are solved exactly instead
+# of searched to a fixed depth (0 turns the solver off).  See
+# count4_endgame.py for the benchmark behind the value.
+ENDGAME_CELLS = 16
 CELL_SIZE = 80
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "count4_book.bin")
 
-def create_board():
-    return [[0] * COLS for _ in range(ROWS)]
-
-def drop_piece(board, row, col, piece):
-    board[row][col] = piece
-
-def is_valid_location(board, col):
-    return board[0][col] == 0
+# Bitboard layout: each column owns ROWS + 1 bits (the extra bit is a
+# sentinel that stops shifts from wrapping into the next column).  Bit
+# ``col * H1 + h`` is the cell ``h`` places above the bottom of ``col``, so
+# GUI row ``r`` (0 = top) maps to ``h = ROWS - 1 - r``.
+H1 = ROWS + 1
 
-def get_next_open_row(board, col):
-    for r in range(ROWS-1, -1, -1):
-        if board[r][col] == 0:
-            return r
+def _bit(row, col):
+    return 1 << (col * H1 + ROWS - 1 - row)
 
-def winning_move(board, piece):
-    # Horizontal
+def _build_window_masks():
+    masks = []
     for r in range(ROWS):
         for c in range(COLS-3):
-            if all(board[r][c+i] == piece for i in range(4)):
-                return True
-    # Vertical
+            masks.append(sum(_bit(r, c+i) for i in range(WINDOW_LENGTH)))
     for c in range(COLS):
         for r in range(ROWS-3):
-            if all(board[r+i][c] == piece for i in range(4)):
-                return True
-    # Positive diagonals
+            masks.append(sum(_bit(r+i, c) for i in range(WINDOW_LENGTH)))
     for r in range(ROWS-3):
         for c in range(COLS-3):
-            if all(board[r+i][c+i] == piece for i in range(4)):
-                return True
-    # Negative diagonals
-    for r in range(3, ROWS):
+            masks.append(sum(_bit(r+i, c+i) for i in range(WINDOW_LENGTH)))
+    for r in range(ROWS-3):
         for c in range(COLS-3):
-            if all(board[r-i][c+i] == piece for i in range(4)):
-                return True
+            masks.append(sum(_bit(r+3-i, c+i) for i in range(WINDOW_LENGTH)))
+    return masks
+
+WINDOW_MASKS = _build_window_masks()
+CENTER_MASK = sum(_bit(r, COLS//2) for r in range(ROWS))
+# CELL_WINDOWS[idx] lists the (at most 16) windows that contain bit ``idx``;
+# CELL_WINDOW_IDS[idx] holds their positions in WINDOW_MASKS.
+CELL_WINDOW_IDS = [[w for w, mask in enumerate(WINDOW_MASKS) if mask >> idx & 1] for idx in range(COLS * H1)]
+CELL_WINDOWS = [[WINDOW_MASKS[w] for w in ids] for ids in CELL_WINDOW_IDS]
+
+# Zobrist keys: one random 64-bit value per (piece, bitboard bit), plus one
+# for "AI to move".  Seeded so hashes are stable across runs and processes.
+_zobrist_rng = random.Random(0xC4)
+ZOBRIST = [[_zobrist_rng.getrandbits(64) for _ in range(COLS * H1)] for _ in range(3)]
+ZOBRIST_SIDE = _zobrist_rng.getrandbits(64)
+del _zobrist_rng
+
+class Board:
+    """Connect Four position stored as one bitboard per player.
+
+    ``bitboards`` is indexed by piece (``PLAYER``/``AI``; slot 0 is unused),
+    ``heights`` holds the number of pieces already in each column and
+    ``hash`` is the Zobrist key of the stones on the board.
+
+    The board also carries an incremental evaluation: ``window_states[w]``
+    encodes the piece counts of window ``w`` as ``ai * 5 + player`` and
+    ``scores[piece]`` is score_position(board, piece), both updated from
+    only the windows through the changed cell on every play/undo.
+    """
+    __slots__ = ("bitboards", "heights", "hash", "window_states", "scores")
+
+    def __init__(self):
+        self.bitboards = [0, 0, 0]
+        self.heights = [0] * COLS
+        self.hash = 0
+        self.window_states = [0] * len(WINDOW_MASKS)
+        self.scores = [0, 0, 0]
+
+    def get(self, row, col):
+        bit = _bit(row, col)
+        if self.bitboards[PLAYER] & bit:
+            return PLAYER
+        if self.bitboards[AI] & bit:
+            return AI
+        return EMPTY
+
+    def play(self, col, piece):
+        """Drops ``piece`` into ``col`` in place and returns its row."""
+        h = self.heights[col]
+        idx = col * H1 + h
+        self.bitboards[piece] |= 1 << idx
+        self.hash ^= ZOBRIST[piece][idx]
+        self.heights[col] = h + 1
+        states = self.window_states
+        player_delta = PLAYER_VIEW_DELTA[piece]
+        ai_delta = AI_VIEW_DELTA[piece]
+        step = WINDOW_STEP[piece]
+        dp = da = 0
+        for w in CELL_WINDOW_IDS[idx]:
+            st = states[w]
+            dp += player_delta[st]
+            da += ai_delta[st]
+            states[w] = st + step
+        scores = self.scores
+        scores[PLAYER] += dp
+        scores[AI] += da
+        scores[piece] += CENTER_WEIGHTS[idx]
+        return ROWS - 1 - h
+
+    def undo(self, col, piece):
+        """Takes back the top ``piece`` of ``col`` played by :meth:`play`."""
+        h = self.heights[col] - 1
+        idx = col * H1 + h
+        self.bitboards[piece] ^= 1 << idx
+        self.hash ^= ZOBRIST[piece][idx]
+        self.heights[col] = h
+        states = self.window_states
+        player_delta = PLAYER_VIEW_DELTA[piece]
+        ai_delta = AI_VIEW_DELTA[piece]
+        step = WINDOW_STEP[piece]
+        dp = da = 0
+        for w in CELL_WINDOW_IDS[idx]:
+            st = states[w] - step
+            dp += player_delta[st]
+            da += ai_delta[st]
+            states[w] = st
+        scores = self.scores
+        scores[PLAYER] -= dp
+        scores[AI] -= da
+        scores[piece] -= CENTER_WEIGHTS[idx]
+
+    def copy(self):
+        other = Board()
+        other.bitboards = self.bitboards[:]
+        other.heights = self.heights[:]
+        other.hash = self.hash
+        other.window_states = self.window_states[:]
+        other.scores = self.scores[:]
+        return other
+
+# Scores of won positions are WIN_SCORE or more, far above any heuristic value.
+WIN_SCORE = 1e10
+
+# Bound types stored in the transposition table.
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+class TranspositionTable:
+    """Fixed-size, Zobrist-keyed cache of search results.
+
+    Each slot holds ``(key, depth, score, flag, move, generation)``.  A new
+    result replaces the slot when the slot is empty, was written by an older
+    search (see :meth:`new_search`) or was searched no deeper than the new
+    result; otherwise the deeper entry from the current search is kept.
+    """
+
+    def __init__(self, size=1 << 18):
+        self.size = size
+        self.entries = [None] * size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.replacements = 0
+
+    @classmethod
+    def for_memory(cls, megabytes):
+        """Builds a table with as many slots as fit in ``megabytes``."""
+        return cls(max(1, int(megabytes * 1024 * 1024 // cls.entry_bytes())))
+
+    @staticmethod
+    def entry_bytes():
+        """Approximate heap cost of one filled slot, in bytes."""
+        sample = ((1 << 63) + 1, MAX_DEPTH, 1.5, EXACT, 0, 0)
+        return sys.getsizeof(sample) + sys.getsizeof(sample[0]) + sys.getsizeof(sample[2]) + 8
+
+    def new_search(self):
+        """Ages every stored entry so the next search may overwrite it."""
+        self.generation += 1
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.hits = self.misses = self.stores = self.replacements = 0
+
+    def probe(self, key):
+        """Returns ``(depth, score, flag, move)`` for ``key`` or ``None``."""
+        entry = self.entries[key % self.size]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1:5]
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        slot = key % self.size
+        old = self.entries[slot]
+        if old is not None:
+            if old[5] == self.generation and old[1] > depth:
+                return
+            if old[0] != key:
+                self.replacements += 1
+        self.entries[slot] = (key, depth, score, flag, move, self.generation)
+        self.stores += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        used = sum(1 for e in self.entries if e is not None)
+        return {
+            "size": self.size,
+            "used": used,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "replacements": self.replacements,
+            "approx_bytes": used * self.entry_bytes(),
+        }
+
+def create_board():
+    return Board()
+
+def drop_piece(board, row, col, piece):
+    # ``row`` is always the next open row of ``col``; play() derives it.
+    board.play(col, piece)
+
+def undo_piece(board, col, piece):
+    board.undo(col, piece)
+
+def is_valid_location(board, col):
+    return board.heights[col] < ROWS
+
+def get_next_open_row(board, col):
+    h = board.heights[col]
+    if h < ROWS:
+        return ROWS - 1 - h
+
+def has_four(bb):
+    # Vertical, horizontal, then both diagonals: a set bit in ``m & m >> 2s``
+    # marks four stones in a row along the direction with stride ``s``.
+    for shift in (1, H1, H1 - 1, H1 + 1):
+        m = bb & (bb >> shift)
+        if m & (m >> (2 * shift)):
+            return True
+    return False
+
+def winning_move(board, piece):
+    return has_four(board.bitboards[piece])
+
+def winning_move_at(board, row, col, piece):
+    """Checks only the lines through (row, col), i.e. whether dropping
+    ``piece`` there just won.  Much cheaper than a full winning_move scan."""
+    bb = board.bitboards[piece]
+    for mask in CELL_WINDOWS[col * H1 + ROWS - 1 - row]:
+        if bb & mask == mask:
+            return True
     return False
 
 def evaluate_window(window, piece):
@@ -62,97 +284,749 @@ def evaluate_window(window, piece):
         score -= 4
     return score
 
-def score_position(board, piece):
-    score = 0
-    center_array = [board[r][COLS//2] for r in range(ROWS)]
-    score += center_array.count(piece) * 3
+# WINDOW_SCORES[own * 5 + opp] is evaluate_window() for a window holding
+# ``own`` of our pieces and ``opp`` of the opponent's.
+WINDOW_SCORES = [
+    evaluate_window([AI] * own + [PLAYER] * opp + [EMPTY] * (WINDOW_LENGTH - own - opp), AI)
+    if own + opp <= WINDOW_LENGTH else 0
+    for own in range(5) for opp in range(5)
+]
 
-    for r in range(ROWS):
-        row_array = board[r]
-        for c in range(COLS-3):
-            score += evaluate_window(row_array[c:c+WINDOW_LENGTH], piece)
+# Incremental evaluation tables used by Board.play/undo.  A window's state is
+# ``ai * 5 + player``; adding ``piece`` advances it by WINDOW_STEP[piece], and
+# AI_VIEW_DELTA/PLAYER_VIEW_DELTA[piece][state] is the resulting change of
+# that window's score from each side's point of view.
+WINDOW_STEP = [0, 1, 5]
+_SWAPPED_SCORES = [WINDOW_SCORES[(st % 5) * 5 + st // 5] for st in range(25)]
 
-    for c in range(COLS):
-        col_array = [board[r][c] for r in range(ROWS)]
-        for r in range(ROWS-3):
-            score += evaluate_window(col_array[r:r+WINDOW_LENGTH], piece)
+def _view_delta(view_scores, step):
+    return [view_scores[st + step] - view_scores[st] if st + step < 25 else 0 for st in range(25)]
 
-    for r in range(ROWS-3):
-        for c in range(COLS-3):
-            window = [board[r+i][c+i] for i in range(WINDOW_LENGTH)]
-            score += evaluate_window(window, piece)
+AI_VIEW_DELTA = [None, _view_delta(WINDOW_SCORES, 1), _view_delta(WINDOW_SCORES, 5)]
+PLAYER_VIEW_DELTA = [None, _view_delta(_SWAPPED_SCORES, 1), _view_delta(_SWAPPED_SCORES, 5)]
+CENTER_WEIGHTS = [3 if CENTER_MASK >> idx & 1 else 0 for idx in range(COLS * H1)]
 
-    for r in range(ROWS-3):
-        for c in range(COLS-3):
-            window = [board[r+3-i][c+i] for i in range(WINDOW_LENGTH)]
-            score += evaluate_window(window, piece)
+def score_position(board, piece):
+    return board.scores[piece]
 
+def rescore_position(board, piece):
+    """Computes score_position from scratch by scanning every window."""
+    own = board.bitboards[piece]
+    opp = board.bitboards[PLAYER if piece == AI else AI]
+    score = (own & CENTER_MASK).bit_count() * 3
+    for mask in WINDOW_MASKS:
+        o = own & mask
+        p = opp & mask
+        if o or p:
+            score += WINDOW_SCORES[o.bit_count() * 5 + p.bit_count()]
     return score
 
 def get_valid_locations(board):
-    return [c for c in range(COLS) if is_valid_location(board, c)]
+    heights = board.heights
+    return [c for c in range(COLS) if heights[c] < ROWS]
 
 def is_terminal_node(board):
     return winning_move(board, PLAYER) or winning_move(board, AI) or len(get_valid_locations(board)) == 0
 
-def minimax(board, depth, alpha, beta, maximizingPlayer):
-    valid_locations = get_valid_locations(board)
-    terminal = is_terminal_node(board)
-    if depth == 0 or terminal:
-        if terminal:
-            if winning_move(board, AI):
-                return (None, 1e10)
-            elif winning_move(board, PLAYER):
-                return (None, -1e10)
-            else:
-                return (None, 0)
+class SearchAborted(Exception):
+    """Raised inside minimax when a SearchBudget runs out."""
+
+class SearchBudget:
+    """Wall-clock and/or node limit shared by every node of a search.
+
+    ``nodes`` counts the nodes visited so far; the clock is only read every
+    1024 nodes to keep the per-node cost down.  cancel() may be called from
+    another thread to stop the search at its next node.
+    """
+
+    def __init__(self, time_limit=None, node_limit=None):
+        self.deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def tick(self):
+        self.nodes += 1
+        if self.cancelled:
+            raise SearchAborted
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchAborted
+        if self.deadline is not None and not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            raise SearchAborted
+
+# ----------- Endgame solver -----------
+# Exact negamax on raw bitboards for positions near the end of the game.
+# ``pos`` holds the stones of the side to move, ``mask`` all stones and
+# ``moves`` their number.  Scores are from the side to move's view: 0 for a
+# draw, positive for a win and larger the sooner it comes (a win with the
+# side's next stone scores (CELLS + 1 - moves) // 2), negative for a loss.
+CELLS = ROWS * COLS
+BOTTOM_ROW = sum(1 << (col * H1) for col in range(COLS))
+BOARD_MASK = BOTTOM_ROW * ((1 << ROWS) - 1)
+COLUMN_MASKS = [((1 << ROWS) - 1) << (col * H1) for col in range(COLS)]
+SOLVER_ORDER = sorted(range(COLS), key=lambda col: abs(col - COLS // 2))
+
+def _winning_cells(pos, mask):
+    # Empty cells that would complete a four for ``pos``.
+    r = (pos << 1) & (pos << 2) & (pos << 3)
+    for shift in (H1, H1 - 1, H1 + 1):
+        p = (pos << shift) & (pos << 2 * shift)
+        r |= p & (pos << 3 * shift)
+        r |= p & (pos >> shift)
+        p = (pos >> shift) & (pos >> 2 * shift)
+        r |= p & (pos << shift)
+        r |= p & (pos >> 3 * shift)
+    return r & (BOARD_MASK ^ mask)
+
+def _playable(mask):
+    return (mask + BOTTOM_ROW) & BOARD_MASK
+
+def _negamax(pos, mask, moves, alpha, beta, table, budget):
+    # Assumes the side to move cannot win at once (callers check).
+    if budget is not None:
+        budget.tick()
+    playable = _playable(mask)
+    opp_wins = _winning_cells(pos ^ mask, mask)
+    forced = playable & opp_wins
+    if forced:
+        if forced & (forced - 1):
+            return -((CELLS - moves) // 2)  # two threats: one cannot be blocked
+        playable = forced
+    playable &= ~(opp_wins >> 1)  # never play just below an opponent's four
+    if not playable:
+        return -((CELLS - moves) // 2)
+    if moves >= CELLS - 2:
+        return 0
+
+    low = -((CELLS - 2 - moves) // 2)
+    if alpha < low:
+        alpha = low
+        if alpha >= beta:
+            return alpha
+    high = (CELLS - 1 - moves) // 2
+    key = pos + mask
+    entry = table.probe(key)
+    if entry is not None:
+        if entry[2] == LOWER:
+            low = entry[1]
         else:
-            return (None, score_position(board, AI))
+            high = entry[1]
+    if beta > high:
+        beta = high
+    if alpha < low:
+        alpha = low
+    if alpha >= beta:
+        return alpha
+
+    # Threat ordering: moves that leave the most winning cells first, centre
+    # columns first among equals.
+    candidates = []
+    for col in SOLVER_ORDER:
+        move = playable & COLUMN_MASKS[col]
+        if move:
+            candidates.append((-_winning_cells(pos | move, mask).bit_count(), len(candidates), move))
+    candidates.sort()
+
+    for _, _, move in candidates:
+        score = -_negamax(pos ^ mask, mask | move, moves + 1, -beta, -alpha, table, budget)
+        if score >= beta:
+            table.store(key, CELLS - moves, score, LOWER, None)
+            return score
+        if score > alpha:
+            alpha = score
+    table.store(key, CELLS - moves, alpha, UPPER, None)
+    return alpha
+
+def _solve(pos, mask, moves, table, budget):
+    # Exact score by a sequence of null-window searches that bisect the
+    # possible range (MTD(f)-style), biased towards 0 where most positions lie.
+    if _winning_cells(pos, mask) & _playable(mask):
+        return (CELLS + 1 - moves) // 2
+    low, high = -((CELLS - moves) // 2), (CELLS + 1 - moves) // 2
+    while low < high:
+        mid = low + (high - low) // 2
+        if mid <= 0 and int(low / 2) < mid:
+            mid = int(low / 2)
+        elif mid >= 0 and int(high / 2) > mid:
+            mid = int(high / 2)
+        score = _negamax(pos, mask, moves, mid, mid + 1, table, budget)
+        if score <= mid:
+            high = score
+        else:
+            low = score
+    return low
+
+def _child_score(pos, mask, moves, move, table, budget, alpha=None):
+    # Score of playing ``move`` from the mover's view.  With ``alpha`` it is
+    # a null-window test: a result <= alpha only says the move is no better.
+    child_pos, child_mask = pos ^ mask, mask | move
+    if _winning_cells(child_pos, child_mask) & _playable(child_mask):
+        return -((CELLS - moves) // 2)  # the opponent wins at once
+    if alpha is None:
+        return -_solve(child_pos, child_mask, moves + 1, table, budget)
+    return -_negamax(child_pos, child_mask, moves + 1, -alpha - 1, -alpha, table, budget)
+
+def solve_endgame(board, piece, table=None, budget=None):
+    """Solves ``board`` exactly for ``piece`` to move.
+
+    Returns ``(col, score)`` with the solver score described above; the
+    column is the quickest win, else a draw, else the slowest loss.  The
+    first root move is solved exactly and the rest are only re-solved when
+    a null-window test shows they beat it (principal variation search).
+    """
+    if table is None:
+        table = ENDGAME_TABLE
+    mask = board.bitboards[PLAYER] | board.bitboards[AI]
+    pos = board.bitboards[piece]
+    moves = sum(board.heights)
+    playable = _playable(mask)
+    wins = _winning_cells(pos, mask) & playable
+    best_col, best_score = None, -math.inf
+    for col in SOLVER_ORDER:
+        move = playable & COLUMN_MASKS[col]
+        if not move:
+            continue
+        if wins & move:
+            return col, (CELLS + 1 - moves) // 2
+        if best_col is None:
+            score = _child_score(pos, mask, moves, move, table, budget)
+        else:
+            score = _child_score(pos, mask, moves, move, table, budget, best_score)
+            if score > best_score:
+                score = _child_score(pos, mask, moves, move, table, budget)
+        if score > best_score:
+            best_col, best_score = col, score
+    return best_col, best_score if best_col is not None else 0
+
+def solver_value(score, piece):
+    """Converts a solver score for ``piece`` to minimax's AI-positive scale."""
+    if score == 0:
+        return 0
+    value = WIN_SCORE + abs(score) if score > 0 else -(WIN_SCORE + abs(score))
+    return value if piece == AI else -value
+
+def win_value(board, piece):
+    """minimax value of a position ``piece`` has just won: the earlier the
+    win, the larger, on the same scale as the solver."""
+    value = WIN_SCORE + (CELLS + 2 - sum(board.heights)) // 2
+    return value if piece == AI else -value
+
+def quick_move(board, piece):
+    """A column for ``piece`` without searching: a win, else a block, else
+    the most central free column.  For when an endgame solve runs out of
+    time before it has a move."""
+    mask = board.bitboards[PLAYER] | board.bitboards[AI]
+    playable = _playable(mask)
+    wins = _winning_cells(board.bitboards[piece], mask) & playable
+    blocks = _winning_cells(board.bitboards[piece] ^ mask, mask) & playable
+    for cells in (wins, blocks, playable):
+        for col in SOLVER_ORDER:
+            if cells & COLUMN_MASKS[col]:
+                return col
+    return None
+
+ENDGAME_TABLE = TranspositionTable(1 << 20)
+
+# ----------- Move ordering -----------
+class MoveOrdering:
+    """Orders minimax's moves: the transposition-table move, then the two
+    killer moves (the latest columns to cause a cutoff with the same number
+    of stones on the board), then by history score, then centre first.
+
+    ``history[piece][col]`` grows by depth squared whenever ``col`` causes a
+    cutoff for ``piece``.  Killers and history carry over from one search to
+    the next, so keep one instance for a whole game; :meth:`new_search`
+    halves the history so old cutoffs fade.  With ``seed``, columns the same
+    distance from the centre are shuffled once, reproducibly.
+    """
+
+    def __init__(self, seed=None):
+        rng = random.Random(seed) if seed is not None else None
+        static = sorted(range(COLS), key=lambda col: (abs(col - COLS // 2), rng.random() if rng else col))
+        self.rank = [static.index(col) for col in range(COLS)]
+        self.clear()
+
+    def clear(self):
+        self.killers = [[None, None] for _ in range(CELLS + 1)]
+        self.history = [[0] * COLS for _ in range(3)]
+
+    def new_search(self):
+        for scores in self.history:
+            scores[:] = [score // 2 for score in scores]
+
+    def order(self, moves, stones, piece, tt_move=None):
+        first, second = self.killers[stones]
+        history = self.history[piece]
+        rank = self.rank
+        return sorted(moves, key=lambda col: (col != tt_move, col != first, col != second, -history[col], rank[col]))
+
+    def cutoff(self, col, stones, piece, depth):
+        killers = self.killers[stones]
+        if killers[0] != col:
+            killers[1] = killers[0]
+            killers[0] = col
+        self.history[piece][col] += depth * depth
+
+def minimax(board, depth, alpha, beta, maximizingPlayer, table=None, budget=None, last_move=None, ordering=None):
+    if budget is not None:
+        budget.tick()
+    # With ``last_move`` (row, col) only the lines through that cell can hold
+    # a new four; without it (e.g. at the root) the whole board is scanned.
+    if last_move is None:
+        if winning_move(board, AI):
+            return (None, win_value(board, AI))
+        if winning_move(board, PLAYER):
+            return (None, win_value(board, PLAYER))
+    elif winning_move_at(board, last_move[0], last_move[1], PLAYER if maximizingPlayer else AI):
+        return (None, win_value(board, PLAYER if maximizingPlayer else AI))
+    valid_locations = get_valid_locations(board)
+    if not valid_locations:
+        return (None, 0)
+    # Endgame mode: solve exactly at the root, and below it wherever the
+    # search would reach the end of the game anyway.  Solving every node
+    # that crosses the threshold inside a shallower search costs far more
+    # than it gains.
+    empty = CELLS - sum(board.heights)
+    piece = AI if maximizingPlayer else PLAYER
+    if empty <= ENDGAME_CELLS and (last_move is None or empty <= depth):
+        col, score = solve_endgame(board, piece, None, budget)
+        return col, solver_value(score, piece)
+    if depth == 0:
+        return (None, score_position(board, AI))
+
+    tt_move = None
+    if table is not None:
+        key = (board.hash ^ ZOBRIST_SIDE) if maximizingPlayer else board.hash
+        entry = table.probe(key)
+        if entry is not None:
+            tt_depth, tt_score, tt_flag, tt_move = entry
+            if tt_depth >= depth:
+                if tt_flag == EXACT:
+                    return tt_move, tt_score
+                if tt_flag == LOWER:
+                    alpha = max(alpha, tt_score)
+                else:
+                    beta = min(beta, tt_score)
+                if alpha >= beta:
+                    return tt_move, tt_score
+            if ordering is None:
+                # Search the stored best move first; it is the likeliest cutoff.
+                valid_locations.remove(tt_move)
+                valid_locations.insert(0, tt_move)
+        window_alpha, window_beta = alpha, beta
+    if ordering is not None:
+        stones = CELLS - empty
+        valid_locations = ordering.order(valid_locations, stones, piece, tt_move)
+        best_col = valid_locations[0]
+    else:
+        best_col = random.choice(valid_locations)
 
     if maximizingPlayer:
         value = -math.inf
-        best_col = random.choice(valid_locations)
         for col in valid_locations:
-            row = get_next_open_row(board, col)
-            b_copy = [r[:] for r in board]
-            drop_piece(b_copy, row, col, AI)
-            new_score = minimax(b_copy, depth-1, alpha, beta, False)[1]
+            row = board.play(col, AI)
+            new_score = minimax(board, depth-1, alpha, beta, False, table, budget, (row, col), ordering)[1]
+            board.undo(col, AI)
             if new_score > value:
                 value = new_score
                 best_col = col
             alpha = max(alpha, value)
             if alpha >= beta:
+                if ordering is not None:
+                    ordering.cutoff(col, stones, AI, depth)
                 break
-        return best_col, value
     else:
         value = math.inf
-        best_col = random.choice(valid_locations)
         for col in valid_locations:
-            row = get_next_open_row(board, col)
-            b_copy = [r[:] for r in board]
-            drop_piece(b_copy, row, col, PLAYER)
-            new_score = minimax(b_copy, depth-1, alpha, beta, True)[1]
+            row = board.play(col, PLAYER)
+            new_score = minimax(board, depth-1, alpha, beta, True, table, budget, (row, col), ordering)[1]
+            board.undo(col, PLAYER)
             if new_score < value:
                 value = new_score
                 best_col = col
             beta = min(beta, value)
             if alpha >= beta:
+                if ordering is not None:
+                    ordering.cutoff(col, stones, PLAYER, depth)
                 break
-        return best_col, value
+
+    if table is not None:
+        if value <= window_alpha:
+            flag = UPPER
+        elif value >= window_beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        table.store(key, depth, value, flag, best_col)
+    return best_col, value
+
+def iterative_deepening(board, time_limit=None, node_limit=None, max_depth=None, table=None, budget=None,
+                        ordering=None):
+    """Searches depth 1, 2, ... for the AI until the budget runs out.
+
+    Returns ``(col, score, depth)`` from the deepest iteration that finished.
+    Each iteration leaves its principal variation in ``table``, and minimax
+    tries those moves first on the next, deeper pass.  Depth 1 always
+    completes so there is a move to play even on a tiny budget, except in
+    the endgame, where the single exact solve runs under the budget and
+    quick_move stands in if it is cut short.  Pass a ``budget`` instead of
+    the limits to watch or cancel the search, and a MoveOrdering kept across
+    the game to reuse its killers and history.
+    """
+    board = board.copy()
+    if table is None:
+        table = TranspositionTable()
+    if max_depth is None:
+        max_depth = ROWS * COLS - sum(board.heights)
+    table.new_search()
+    if ordering is None:
+        ordering = MoveOrdering()
+    else:
+        ordering.new_search()
+    if budget is None:
+        budget = SearchBudget(time_limit, node_limit)
+    best = (None, 0, 0)
+    empty = CELLS - sum(board.heights)
+    if empty <= ENDGAME_CELLS:
+        # Solved to the end of the game on the first pass.
+        try:
+            col, score = minimax(board, 1, -math.inf, math.inf, True, table, budget, None, ordering)
+        except SearchAborted:
+            return quick_move(board, AI), 0, 0
+        return col, score, empty
+    for depth in range(1, max_depth + 1):
+        try:
+            col, score = minimax(board, depth, -math.inf, math.inf, True, table,
+                                 budget if depth > 1 else None, None, ordering)
+        except SearchAborted:
+            break
+        best = (col, score, depth)
+        if abs(score) >= WIN_SCORE:
+            break
+    return best
+
+# ----------- Monte Carlo tree search -----------
+# UCT on the solver's raw bitboards, as an alternative to minimax whose
+# strength grows with the time it is given.  Nodes live in parallel arrays
+# indexed by node number; a node's children are allocated together, so a
+# node only records where its block of children starts and how many there
+# are.  A node's statistics are from the view of the player who made the
+# move into it.
+MCTS_EXPLORATION = 1.4
+MCTS_MAX_NODES = 1 << 20
+MCTS_WIN, MCTS_DRAW = 1, 2  # MCTS.terminal values; 0 for a game in progress
+
+def _playout(pos, mask, moves, rng):
+    # Plays the game out with random moves, except that a side always takes
+    # a winning cell and blocks the opponent's.  Returns 1.0 if the side to
+    # move at the start wins, 0.0 if it loses and 0.5 for a draw.
+    side = 1
+    while moves < CELLS:
+        playable = (mask + BOTTOM_ROW) & BOARD_MASK
+        if _winning_cells(pos, mask) & playable:
+            return float(side)
+        forced = _winning_cells(pos ^ mask, mask) & playable
+        if forced:
+            move = forced & -forced
+        else:
+            options = [playable & column for column in COLUMN_MASKS if playable & column]
+            move = options[rng.randrange(len(options))]
+        pos, mask = pos ^ mask, mask | move
+        moves += 1
+        side ^= 1
+    return 0.5
+
+class MCTS:
+    """Monte Carlo tree search engine.
+
+    Each search runs playouts until ``playouts`` or ``time_limit`` is used
+    up, or until the ``budget`` passed to search() runs out (one budget node
+    per playout).  The tree is kept between searches: when the next position
+    is the current root after one or two moves, the subtree under those
+    moves becomes the new root and the rest is dropped.  Expansion stops
+    once ``max_nodes`` nodes exist; playouts then start from the leaves.
+    """
+
+    def __init__(self, playouts=None, time_limit=AI_TIME_LIMIT, exploration=MCTS_EXPLORATION, seed=None,
+                 max_nodes=MCTS_MAX_NODES):
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.max_nodes = max_nodes
+        self.root_state = None  # (mask, AI stones, piece to move) at the root
+        self._reset()
+
+    def _reset(self):
+        self.col = array.array("b", [-1])
+        self.first_child = array.array("i", [-1])
+        self.child_count = array.array("b", [0])
+        self.terminal = array.array("b", [0])
+        self.visits = array.array("i", [0])
+        self.wins = array.array("d", [0.0])
+
+    def __len__(self):
+        return len(self.visits)
+
+    def _add_node(self, col, terminal):
+        self.col.append(col)
+        self.first_child.append(-1)
+        self.child_count.append(0)
+        self.terminal.append(terminal)
+        self.visits.append(0)
+        self.wins.append(0.0)
+
+    def _expand(self, node, pos, mask, moves):
+        playable = _playable(mask)
+        wins = _winning_cells(pos, mask) & playable
+        self.first_child[node] = len(self.visits)
+        count = 0
+        for col in SOLVER_ORDER:
+            move = playable & COLUMN_MASKS[col]
+            if move:
+                self._add_node(col, MCTS_WIN if wins & move else MCTS_DRAW if moves + 1 == CELLS else 0)
+                count += 1
+        self.child_count[node] = count
+
+    def _select(self, node):
+        # UCT: unvisited children first (centre first), then the best
+        # average result plus the exploration bonus.
+        visits, wins = self.visits, self.wins
+        first = self.first_child[node]
+        scale = self.exploration * math.sqrt(math.log(max(visits[node], 1)))
+        best, best_value = first, -math.inf
+        for child in range(first, first + self.child_count[node]):
+            n = visits[child]
+            if n == 0:
+                return child
+            value = wins[child] / n + scale / math.sqrt(n)
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+    def _iterate(self, pos, mask, moves):
+        node = 0
+        path = [0]
+        while self.first_child[node] >= 0 and not self.terminal[node]:
+            node = self._select(node)
+            pos, mask = pos ^ mask, mask | (_playable(mask) & COLUMN_MASKS[self.col[node]])
+            moves += 1
+            path.append(node)
+        if not self.terminal[node] and moves < CELLS and (len(self.visits) < self.max_nodes or node == 0):
+            self._expand(node, pos, mask, moves)
+            node = self._select(node)
+            pos, mask = pos ^ mask, mask | (_playable(mask) & COLUMN_MASKS[self.col[node]])
+            moves += 1
+            path.append(node)
+        # ``result`` is from the view of the player who moved into ``node``.
+        terminal = self.terminal[node]
+        if terminal == MCTS_WIN:
+            result = 1.0
+        elif terminal == MCTS_DRAW or moves == CELLS:
+            result = 0.5
+        else:
+            result = 1.0 - _playout(pos, mask, moves, self.rng)
+        visits, wins = self.visits, self.wins
+        for node in reversed(path):
+            visits[node] += 1
+            wins[node] += result
+            result = 1.0 - result
+
+    def _find(self, state, max_plies=2):
+        # Node number of ``state`` within ``max_plies`` moves of the root, or None.
+        mask, ai_stones, piece = self.root_state
+        stack = [(0, mask, ai_stones, piece, 0)]
+        while stack:
+            node, mask, ai_stones, piece, plies = stack.pop()
+            if (mask, ai_stones, piece) == state:
+                return node
+            first = self.first_child[node]
+            if plies == max_plies or first < 0:
+                continue
+            for child in range(first, first + self.child_count[node]):
+                move = _playable(mask) & COLUMN_MASKS[self.col[child]]
+                stack.append((child, mask | move, ai_stones | move if piece == AI else ai_stones,
+                              PLAYER if piece == AI else AI, plies + 1))
+        return None
+
+    def _reroot(self, root):
+        # Copies the subtree under ``root`` into fresh arrays, breadth first
+        # so each block of children stays contiguous.
+        old = (self.col, self.first_child, self.child_count, self.terminal, self.visits, self.wins)
+        self._reset()
+        self.visits[0] = old[4][root]
+        self.wins[0] = old[5][root]
+        queue = [(root, 0)]
+        for old_node, node in queue:
+            first = old[1][old_node]
+            if first < 0:
+                continue
+            self.first_child[node] = len(self.visits)
+            self.child_count[node] = old[2][old_node]
+            for old_child in range(first, first + old[2][old_node]):
+                queue.append((old_child, len(self.visits)))
+                self._add_node(old[0][old_child], old[3][old_child])
+                self.visits[-1] = old[4][old_child]
+                self.wins[-1] = old[5][old_child]
+
+    def search(self, board, piece=AI, budget=None):
+        """Returns ``(col, win rate, playouts)`` for ``piece`` to move on
+        ``board``.  The win rate counts draws as half a win."""
+        mask = board.bitboards[PLAYER] | board.bitboards[AI]
+        state = (mask, board.bitboards[AI], piece)
+        root = self._find(state) if self.root_state is not None else None
+        if root is None:
+            self._reset()
+        elif root != 0:
+            self._reroot(root)
+        self.root_state = state
+        pos = board.bitboards[piece]
+        moves = sum(board.heights)
+        if moves == CELLS or winning_move(board, PLAYER) or winning_move(board, AI):
+            return None, 0.0, 0
+        if budget is None:
+            budget = SearchBudget(self.time_limit, self.playouts)
+        playouts = 0
+        # One playout always runs so there is a move to play.
+        while not playouts or not (budget.cancelled
+                                   or budget.node_limit is not None and budget.nodes >= budget.node_limit
+                                   or budget.deadline is not None and time.perf_counter() > budget.deadline):
+            self._iterate(pos, mask, moves)
+            budget.nodes += 1
+            playouts += 1
+        col, win_rate = self.best_move()
+        return col, win_rate, playouts
+
+    def _child(self, node, col):
+        first = self.first_child[node]
+        for child in range(first, first + self.child_count[node]) if first >= 0 else ():
+            if self.col[child] == col:
+                return child
+        return None
+
+    def child_visits(self, col):
+        """Playouts so far through the root's move ``col``."""
+        child = self._child(0, col)
+        return self.visits[child] if child is not None else 0
+
+    def best_move(self, node=0):
+        """Returns ``(col, win rate)`` of the most-visited move from ``node``
+        (the root by default), or ``(None, 0.0)`` if it has not been searched."""
+        first = self.first_child[node]
+        if first < 0:
+            return None, 0.0
+        best = max(range(first, first + self.child_count[node]), key=lambda child: self.visits[child])
+        return self.col[best], self.wins[best] / max(self.visits[best], 1)
+
+    def best_reply(self, col):
+        """best_move() for the position after the root's move ``col``.  Reads
+        the tree in place, so it is cheap; the next search() re-roots it."""
+        child = self._child(0, col)
+        return self.best_move(child) if child is not None else (None, 0.0)
+
+# ----------- Opening book -----------
+# A book file (written by count4_book.py) is a header followed by fixed-size
+# records sorted by key.  The key is the position's transposition-table key
+# with the AI to move, so a record gives the AI's best column and its score.
+BOOK_MAGIC = b"C4BK"
+BOOK_HEADER = struct.Struct("<4sHHQ")  # magic, plies, search depth, record count
+BOOK_RECORD = struct.Struct("<QfB3x")  # key, score, column
+
+def book_key(board):
+    return board.hash ^ ZOBRIST_SIDE
+
+class OpeningBook:
+    """Read-only view of a book file through ``mmap``.
+
+    Lookups binary-search the mapped records, so nothing is loaded into the
+    heap and processes that open the same file share its pages.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < BOOK_HEADER.size:
+                raise ValueError(f"{path} is not a Connect Four opening book")
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.plies, self.depth, self.count = BOOK_HEADER.unpack_from(self.data, 0)
+        if magic != BOOK_MAGIC or len(self.data) != BOOK_HEADER.size + self.count * BOOK_RECORD.size:
+            self.data.close()
+            raise ValueError(f"{path} is not a Connect Four opening book")
+
+    @classmethod
+    def open(cls, path=BOOK_PATH):
+        """Returns the book at ``path``, or None if there is no readable book
+        file there (missing, empty, truncated or corrupt)."""
+        try:
+            return cls(path)
+        except (OSError, ValueError):
+            return None
+
+    def lookup(self, board):
+        """Returns ``(col, score)`` for the AI to move on ``board``, or None."""
+        key = book_key(board)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key, score, col = BOOK_RECORD.unpack_from(self.data, BOOK_HEADER.size + mid * BOOK_RECORD.size)
+            if mid_key < key:
+                lo = mid + 1
+            elif mid_key > key:
+                hi = mid
+            else:
+                return (col, score) if col < COLS and is_valid_location(board, col) else None
+        return None
+
+    def close(self):
+        self.data.close()
 
 # ----------- GUI -----------
+ENGINE_TITLES = {"minimax": "Minimax", "mcts": "MCTS"}
+
 class ConnectFourGUI:
-    def __init__(self, root):
+    def __init__(self, root, book=None, engine="minimax", ponder=True):
         self.root = root
-        self.root.title("Connect Four (Minimax AI)")
         self.board = create_board()
+        self.table = TranspositionTable()
+        self.ordering = MoveOrdering()
+        self.ponder_ordering = MoveOrdering()  # kept apart so pondering does not age the history
+        self.mcts = MCTS()
+        self.book = book
         self.turn = PLAYER
+        self.search = None
+        self.budget = None
+        self.ponder_enabled = ponder
+        self.ponder = None
+        self.ponder_engine = None
+        self.ponder_budget = None
+        self.ponder_started = None
+        self.ponder_skipped = set()
+        self.ponder_hits = 0
+        self.ponder_misses = 0
 
         self.canvas = tk.Canvas(root, width=COLS*CELL_SIZE, height=ROWS*CELL_SIZE, bg="blue")
         self.canvas.pack()
         self.canvas.bind("<Button-1>", self.human_move)
 
+        self.status_label = tk.Label(root, text="Your turn", font=("Helvetica", 12))
+        self.status_label.pack(fill=tk.X)
+
+        # The engine can be switched mid-game; it applies from the AI's next move.
+        engine_frame = tk.Frame(root)
+        engine_frame.pack()
+        tk.Label(engine_frame, text="Engine:").pack(side=tk.LEFT)
+        self.engine_var = tk.StringVar(value=engine)
+        tk.OptionMenu(engine_frame, self.engine_var, *ENGINE_TITLES, command=self.set_title).pack(side=tk.LEFT)
+        self.set_title()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
         self.draw_board()
+        self.start_pondering()
+
+    def set_title(self, *_):
+        self.root.title(f"Connect Four ({ENGINE_TITLES[self.engine_var.get()]} AI)")
 
     def draw_board(self):
         self.canvas.delete("all")
@@ -163,7 +1037,7 @@ class ConnectFourGUI:
                 x2 = x1 + CELL_SIZE
                 y2 = y1 + CELL_SIZE
                 self.canvas.create_oval(x1+5, y1+5, x2-5, y2-5,
-                    fill=self.get_color(self.board[r][c]), outline="black")
+                    fill=self.get_color(self.board.get(r, c)), outline="black")
 
     def get_color(self, piece):
         if piece == PLAYER:
@@ -181,7 +1055,7 @@ class ConnectFourGUI:
         drop_piece(self.board, row, col, PLAYER)
         self.draw_board()
 
-        if winning_move(self.board, PLAYER):
+        if winning_move_at(self.board, row, col, PLAYER):
             self.end_game("You Win!")
             return
 
@@ -190,16 +1064,131 @@ class ConnectFourGUI:
             return
 
         self.turn = AI
-        self.root.after(500, self.ai_move)
+        reply = self.take_ponder(col)
+        if reply is not None:
+            self.status_label.config(text=f"Your turn (AI replied at once from pondering{self.ponder_summary()})")
+            self.play_ai_move(reply[0])
+        else:
+            self.root.after(500, self.ai_move)
+
+    # Pondering: while the human thinks, the minimax engine searches the
+    # AI's answer to each reply (the table's predicted reply first, then in
+    # MoveOrdering order) with the usual time limit per reply, and MCTS
+    # grows its tree from the human's position.  A reply that was searched
+    # in full, or for MCTS the reply the tree expected, is answered at once.
+    def start_pondering(self):
+        if not self.ponder_enabled:
+            return
+        self.ponder_engine = self.engine_var.get()
+        self.ponder_skipped = set()
+        if self.ponder_engine == "mcts":
+            self.ponder_budget = SearchBudget()
+            self.ponder_started = time.perf_counter()
+            self.ponder = Ponder([("tree", self.mcts.search, (self.board.copy(), PLAYER, self.ponder_budget))],
+                                 self.ponder_budget.cancel)
+            return
+        entry = self.table.probe(self.board.hash)
+        replies = self.ordering.order(get_valid_locations(self.board), sum(self.board.heights), PLAYER,
+                                      entry[3] if entry is not None else None)
+        tasks = []
+        budgets = []
+        for col in replies:
+            board = self.board.copy()
+            row = board.play(col, PLAYER)
+            if (winning_move_at(board, row, col, PLAYER) or not get_valid_locations(board)
+                    or self.book is not None and self.book.lookup(board) is not None):
+                self.ponder_skipped.add(col)  # the book answers, or there is nothing to answer
+                continue
+            budget = SearchBudget()
+            budgets.append(budget)
+            tasks.append((col, self.ponder_search, (board, budget)))
+
+        def stop():
+            for budget in budgets:
+                budget.cancel()
+        self.ponder = Ponder(tasks, stop)
+
+    def ponder_search(self, board, budget):
+        # Each reply gets AI_TIME_LIMIT from when its search starts.
+        budget.deadline = time.perf_counter() + AI_TIME_LIMIT
+        return iterative_deepening(board, None, None, None, self.table, budget, self.ponder_ordering)
+
+    def take_ponder(self, col):
+        """Stops pondering once the human has played ``col`` and returns the
+        AI's pondered reply, or None to search as usual."""
+        if self.ponder is None:
+            return None
+        results = self.ponder.stop()
+        self.ponder = None
+        if col in self.ponder_skipped:
+            return None
+        reply = None
+        if self.ponder_engine == self.engine_var.get() == "mcts":
+            # A hit needs as many playouts under ``col`` as a normal search
+            # would run in AI_TIME_LIMIT at the rate pondering managed; a
+            # smaller subtree is still reused by the normal search.  The reply
+            # is read from the tree as it stands: re-rooting copies the whole
+            # subtree, which is left to the next search on the worker.
+            elapsed = time.perf_counter() - self.ponder_started
+            rate = self.ponder_budget.nodes / elapsed if elapsed > 0 else 0
+            if self.ponder_budget.nodes and self.mcts.child_visits(col) >= rate * AI_TIME_LIMIT:
+                reply = self.mcts.best_reply(col)
+                if reply[0] is None:
+                    reply = None
+        elif self.ponder_engine == self.engine_var.get():
+            reply = results.get(col)
+        if reply is None:
+            self.ponder_misses += 1
+        else:
+            self.ponder_hits += 1
+        return reply
+
+    def ponder_summary(self):
+        if not self.ponder_enabled or not self.ponder_hits + self.ponder_misses:
+            return ""
+        return f"; ponder hits {self.ponder_hits}, misses {self.ponder_misses}"
 
     def ai_move(self):
-        col, _ = minimax(self.board, MAX_DEPTH, -math.inf, math.inf, True)
-        if is_valid_location(self.board, col):
-            row = get_next_open_row(self.board, col)
-            drop_piece(self.board, row, col, AI)
+        entry = self.book.lookup(self.board) if self.book is not None else None
+        if entry is not None:
+            self.status_label.config(text="Your turn (AI played from the opening book)")
+            self.play_ai_move(entry[0])
+            return
+        # The search runs on a worker thread; finish_ai_move picks it up.
+        self.budget = SearchBudget(AI_TIME_LIMIT)
+        self.status_label.config(text="AI thinking...")
+        if self.engine_var.get() == "mcts":
+            fn, args, on_done = self.mcts.search, (self.board, AI, self.budget), self.finish_mcts_move
+        else:
+            fn, args = iterative_deepening, (self.board, None, None, None, self.table, self.budget, self.ordering)
+            on_done = self.finish_ai_move
+        self.search = BackgroundSearch(self.root, fn, args, on_done=on_done, on_tick=self.show_thinking,
+                                       stop=self.budget.cancel)
+
+    def show_thinking(self):
+        unit = "playouts" if self.engine_var.get() == "mcts" else "nodes"
+        self.status_label.config(text=f"AI thinking... {self.budget.nodes:,} {unit}")
+
+    def finish_ai_move(self, result):
+        col, _, depth = result
+        self.search = None
+        self.status_label.config(
+            text=f"Your turn (AI searched depth {depth}, {self.budget.nodes:,} nodes{self.ponder_summary()})")
+        self.play_ai_move(col)
+
+    def finish_mcts_move(self, result):
+        col, win_rate, playouts = result
+        self.search = None
+        self.status_label.config(
+            text=f"Your turn (AI ran {playouts:,} playouts, expects {win_rate:.0%}{self.ponder_summary()})")
+        self.play_ai_move(col)
+
+    def play_ai_move(self, col):
+        row = get_next_open_row(self.board, col)
+        drop_piece(self.board, row, col, AI)
         self.draw_board()
 
-        if winning_move(self.board, AI):
+        if winning_move_at(self.board, row, col, AI):
             self.end_game("AI Wins!")
             return
 
@@ -208,13 +1197,32 @@ class ConnectFourGUI:
             return
 
         self.turn = PLAYER
+        self.start_pondering()
 
     def end_game(self, msg):
         self.draw_board()
         messagebox.showinfo("Game Over", msg)
+        self.close()
+
+    def close(self):
+        if self.search is not None:
+            self.search.cancel()
+            self.search = None
+        if self.ponder is not None:
+            self.ponder.stop()
+            self.ponder = None
+        if self.book is not None:
+            self.book.close()
+            self.book = None
         self.root.destroy()
 
 # ------------ Run ------------
-root = tk.Tk()
-app = ConnectFourGUI(root)
-root.mainloop()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Connect Four against the computer.")
+    parser.add_argument("--engine", choices=sorted(ENGINE_TITLES), default="minimax")
+    parser.add_argument("--no-ponder", dest="ponder", action="store_false",
+                        help="do not search during the human's turn")
+    args = parser.parse_args()
+    root = tk.Tk()
+    app = ConnectFourGUI(root, OpeningBook.open(), args.engine, args.ponder)
+    root.mainloop()
@@ -0,0 +1,97 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from count4 import (AI, CENTER_MASK, COLS, H1, PLAYER, ROWS, WINDOW_LENGTH, WINDOW_MASKS,
+                    WINDOW_SCORES, create_board, get_valid_locations, rescore_position)
+
+# Vectorised score_position for many Connect Four positions at once.  Boards
+# are (N, ROWS, COLS) integer arrays in the GUI's layout (row 0 is the top)
+# holding EMPTY/PLAYER/AI.  Every window is gathered with one fancy-indexing
+# step and scored with the same WINDOW_SCORES table count4 uses, so the
+# results match score_position exactly.
+
+def _cell_of_bit(idx):
+    col, h = divmod(idx, H1)
+    return (ROWS - 1 - h) * COLS + col
+
+def _bits(mask):
+    return [idx for idx in range(COLS * H1) if mask >> idx & 1]
+
+# WINDOW_INDEX[w] holds the flat cells (row * COLS + col) of window w, in
+# the same order as count4.WINDOW_MASKS.
+WINDOW_INDEX = np.array([[_cell_of_bit(idx) for idx in _bits(mask)] for mask in WINDOW_MASKS], dtype=np.intp)
+CENTER_INDEX = np.array([_cell_of_bit(idx) for idx in _bits(CENTER_MASK)], dtype=np.intp)
+SCORE_TABLE = np.array(WINDOW_SCORES, dtype=np.int64)
+# Bit of each flat cell in a count4 bitboard, for converting Board objects.
+CELL_SHIFTS = np.array([(ROWS - 1 - r) + c * H1 for r in range(ROWS) for c in range(COLS)], dtype=np.int64)
+
+def score_positions(boards, piece):
+    """Returns score_position(board, piece) for every board in the
+    (N, ROWS, COLS) array ``boards`` as an int64 array of length N."""
+    cells = np.asarray(boards).reshape(-1, ROWS * COLS)
+    opp_piece = PLAYER if piece == AI else AI
+    windows = cells[:, WINDOW_INDEX]
+    own = (windows == piece).sum(axis=2)
+    opp = (windows == opp_piece).sum(axis=2)
+    scores = SCORE_TABLE[own * (WINDOW_LENGTH + 1) + opp].sum(axis=1)
+    return scores + (cells[:, CENTER_INDEX] == piece).sum(axis=1) * 3
+
+def boards_to_array(boards):
+    """Stacks count4 Board objects into an (N, ROWS, COLS) int8 array."""
+    player_bits = np.array([b.bitboards[PLAYER] for b in boards], dtype=np.int64)[:, None]
+    ai_bits = np.array([b.bitboards[AI] for b in boards], dtype=np.int64)[:, None]
+    cells = ((player_bits >> CELL_SHIFTS) & 1) * PLAYER + ((ai_bits >> CELL_SHIFTS) & 1) * AI
+    return cells.astype(np.int8).reshape(-1, ROWS, COLS)
+
+def random_positions(count, seed=0):
+    """Random legal-looking positions (alternating drops) for benchmarking."""
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        board = create_board()
+        piece = PLAYER
+        for _ in range(rng.randint(0, ROWS * COLS - 1)):
+            board.play(rng.choice(get_valid_locations(board)), piece)
+            piece = AI if piece == PLAYER else PLAYER
+        boards.append(board)
+    return boards
+
+def benchmark(count=20000, seed=0):
+    """Returns positions/second for the scalar rescore_position scan and for
+    score_positions (with and without the Board -> array conversion)."""
+    boards = random_positions(count, seed)
+
+    start = time.perf_counter()
+    scalar = [rescore_position(board, AI) for board in boards]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    array = boards_to_array(boards)
+    convert_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = score_positions(array, AI)
+    batch_time = time.perf_counter() - start
+
+    if batched.tolist() != scalar:
+        raise AssertionError("batched scores differ from score_position")
+    return {
+        "positions": count,
+        "scalar_per_sec": count / scalar_time,
+        "batch_per_sec": count / batch_time,
+        "batch_with_conversion_per_sec": count / (batch_time + convert_time),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched Connect Four evaluation.")
+    parser.add_argument("--positions", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    result = benchmark(args.positions, args.seed)
+    print(f"{result['positions']} positions")
+    print(f"scalar rescore_position:          {result['scalar_per_sec']:12,.0f} positions/s")
+    print(f"score_positions:                  {result['batch_per_sec']:12,.0f} positions/s")
+    print(f"score_positions incl. conversion: {result['batch_with_conversion_per_sec']:12,.0f} positions/s")
@@ -0,0 +1,94 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from count4 import (AI, BOOK_HEADER, BOOK_MAGIC, BOOK_PATH, BOOK_RECORD, COLS, H1, PLAYER, OpeningBook,
+                    TranspositionTable, book_key, create_board, get_valid_locations, iterative_deepening,
+                    winning_move)
+
+# Offline builder for the count4 opening book.  Every position with the AI
+# to move among the first --plies plies (either side moving first) is
+# searched to --depth and written as a sorted, fixed-record file that
+# count4.OpeningBook maps into memory.  Mirror-image positions share one
+# search: the mirrored board gets the mirrored column.
+
+def mirror(board):
+    """Returns ``board`` reflected left to right."""
+    other = create_board()
+    for col in range(COLS):
+        for h in range(board.heights[col]):
+            bit = 1 << (col * H1 + h)
+            piece = PLAYER if board.bitboards[PLAYER] & bit else AI
+            other.play(COLS - 1 - col, piece)
+    return other
+
+def book_positions(plies):
+    """Maps book key -> board for each position with the AI to move and
+    fewer than ``plies`` stones, reached with either side moving first."""
+    positions = {}
+
+    def walk(board, piece, stones):
+        if stones >= plies or winning_move(board, PLAYER) or winning_move(board, AI):
+            return
+        if piece == AI:
+            positions.setdefault(book_key(board), board.copy())
+        for col in get_valid_locations(board):
+            board.play(col, piece)
+            walk(board, PLAYER if piece == AI else AI, stones + 1)
+            board.undo(col, piece)
+
+    walk(create_board(), PLAYER, 0)
+    walk(create_board(), AI, 0)
+    return positions
+
+def _search_task(args):
+    board, depth = args
+    col, score, _ = iterative_deepening(board, max_depth=depth, table=TranspositionTable())
+    return col, score
+
+def build_book(path=BOOK_PATH, plies=4, depth=10, workers=None):
+    """Searches every book position and writes the book to ``path``.
+    Returns the number of records written."""
+    positions = book_positions(plies)
+    # Only search one of each mirror pair.
+    todo = {}
+    for key, board in positions.items():
+        if book_key(mirror(board)) not in todo:
+            todo[key] = board
+    workers = workers or os.cpu_count() or 1
+    tasks = [(board, depth) for board in todo.values()]
+    if workers == 1:
+        results = [_search_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_search_task, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+    records = {}
+    for board, (col, score) in zip(todo.values(), results):
+        records[book_key(board)] = (score, col)
+        records.setdefault(book_key(mirror(board)), (score, COLS - 1 - col))
+
+    # Written to a temporary file and renamed, so processes that already
+    # have the old book mapped keep a consistent view.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(BOOK_HEADER.pack(BOOK_MAGIC, plies, depth, len(records)))
+        for key in sorted(records):
+            score, col = records[key]
+            f.write(BOOK_RECORD.pack(key, score, col))
+    os.replace(tmp_path, path)
+    return len(records)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the Connect Four opening book.")
+    parser.add_argument("--plies", type=int, default=4, help="cover positions with fewer stones than this")
+    parser.add_argument("--depth", type=int, default=10, help="search depth for each position")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--output", default=BOOK_PATH)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    count = build_book(args.output, args.plies, args.depth, args.workers)
+    book = OpeningBook(args.output)
+    print(f"{count} positions to depth {book.depth} in {time.perf_counter() - start:.1f}s -> {args.output}")
+    book.close()
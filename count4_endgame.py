@@ -0,0 +1,89 @@
+import argparse
+import math
+import random
+import time
+
+import count4
+from count4 import AI, CELLS, PLAYER, TranspositionTable, get_valid_locations, minimax, solve_endgame, winning_move_at
+
+# Benchmark for count4.ENDGAME_CELLS.  Late-game positions are taken from
+# depth-4 self-play games (with random opening moves so the games differ).
+# For each number of empty cells the exact solver is timed against
+# minimax searching the same position to the end of the game on the
+# heuristic path, which is what it would take to be as accurate.  The
+# crossover should be the largest count whose slowest solve still fits the
+# GUI's AI_TIME_LIMIT.
+
+def self_play_positions(games, seed=0, random_plies=4, depth=4):
+    """Returns {empty cells: [(board, piece to move), ...]} from ``games``
+    self-play games, one position per empty count per game."""
+    saved, count4.ENDGAME_CELLS = count4.ENDGAME_CELLS, 0
+    try:
+        positions = {}
+        for n in range(games):
+            rng = random.Random(seed + n)
+            board = count4.create_board()
+            piece = PLAYER
+            while get_valid_locations(board):
+                positions.setdefault(CELLS - sum(board.heights), []).append((board.copy(), piece))
+                if sum(board.heights) < random_plies:
+                    col = rng.choice(get_valid_locations(board))
+                else:
+                    col, _ = minimax(board, depth, -math.inf, math.inf, piece == AI)
+                row = board.play(col, piece)
+                if winning_move_at(board, row, col, piece):
+                    break
+                piece = AI if piece == PLAYER else PLAYER
+        return positions
+    finally:
+        count4.ENDGAME_CELLS = saved
+
+def _time_solver(board, piece):
+    start = time.perf_counter()
+    solve_endgame(board, piece, TranspositionTable(1 << 20))
+    return time.perf_counter() - start
+
+def _time_full_minimax(board, piece, node_limit):
+    saved, count4.ENDGAME_CELLS = count4.ENDGAME_CELLS, 0
+    budget = count4.SearchBudget(node_limit=node_limit)
+    start = time.perf_counter()
+    try:
+        minimax(board, CELLS - sum(board.heights), -math.inf, math.inf, piece == AI, TranspositionTable(), budget)
+    except count4.SearchAborted:
+        return None
+    finally:
+        count4.ENDGAME_CELLS = saved
+    return time.perf_counter() - start
+
+def benchmark(empties, games=10, seed=0, node_limit=2000000):
+    """Returns rows ``(empty cells, positions, solver median, solver max,
+    minimax median or None)`` in seconds.  Minimax runs that exceed
+    ``node_limit`` nodes count as unfinished; the median is None when
+    more than half are."""
+    positions = self_play_positions(games, seed)
+    rows = []
+    for empty in empties:
+        cases = positions.get(empty, [])
+        if not cases:
+            continue
+        solver = sorted(_time_solver(board, piece) for board, piece in cases)
+        full = sorted((_time_full_minimax(board, piece, node_limit) for board, piece in cases),
+                      key=lambda t: math.inf if t is None else t)
+        rows.append((empty, len(cases), solver[len(solver) // 2], solver[-1], full[len(full) // 2]))
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Connect Four endgame solver crossover.")
+    parser.add_argument("--min-empty", type=int, default=8)
+    parser.add_argument("--max-empty", type=int, default=20)
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--node-limit", type=int, default=2000000,
+                        help="give up on a full-depth minimax after this many nodes")
+    args = parser.parse_args()
+    print(f"ENDGAME_CELLS = {count4.ENDGAME_CELLS}, AI_TIME_LIMIT = {count4.AI_TIME_LIMIT}s")
+    print("empty  positions  solver p50 ms  solver max ms  minimax p50 ms")
+    for empty, count, median, worst, full in benchmark(range(args.min_empty, args.max_empty + 1), args.games,
+                                                       args.seed, args.node_limit):
+        full_text = "unfinished" if full is None else f"{full * 1000:.1f}"
+        print(f"{empty:5d}  {count:9d}  {median * 1000:13.1f}  {worst * 1000:13.1f}  {full_text:>14s}")
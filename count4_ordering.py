@@ -0,0 +1,55 @@
+import argparse
+import math
+import random
+import time
+
+from count4 import MoveOrdering, SearchBudget, TranspositionTable, minimax
+from count4_parallel import BENCH_POSITIONS, position_from_moves
+
+# Benchmark for count4.MoveOrdering.  Every bench position is searched to a
+# fixed depth with a fresh transposition table, once with the old ordering
+# (table move first, then columns left to right) and once with MoveOrdering,
+# and the nodes visited are compared.  The search values must agree: move
+# ordering changes how much of the tree alpha-beta prunes, never the result.
+
+def search_nodes(board, depth, ordering=None, seed=0):
+    """Returns ``(nodes, score)`` for a fixed-depth search of ``board``."""
+    random.seed(seed)  # the old ordering picks its default column at random
+    budget = SearchBudget()
+    _, score = minimax(board, depth, -math.inf, math.inf, True, TranspositionTable(), budget, None, ordering)
+    return budget.nodes, score
+
+def benchmark(depths, positions=BENCH_POSITIONS, seed=0):
+    """Returns rows ``(depth, old nodes, new nodes, old seconds, new seconds)``
+    summed over ``positions``.  Raises AssertionError if the two orderings
+    score a position differently."""
+    boards = [position_from_moves(moves) for moves in positions]
+    rows = []
+    for depth in depths:
+        totals = [0, 0, 0.0, 0.0]
+        for board in boards:
+            start = time.perf_counter()
+            old_nodes, old_score = search_nodes(board, depth, None, seed)
+            middle = time.perf_counter()
+            new_nodes, new_score = search_nodes(board, depth, MoveOrdering(seed), seed)
+            end = time.perf_counter()
+            assert old_score == new_score, (depth, old_score, new_score)
+            totals[0] += old_nodes
+            totals[1] += new_nodes
+            totals[2] += middle - start
+            totals[3] += end - middle
+        rows.append((depth, *totals))
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare Connect Four move ordering by nodes searched.")
+    parser.add_argument("--min-depth", type=int, default=6)
+    parser.add_argument("--max-depth", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(f"{len(BENCH_POSITIONS)} positions, seed {args.seed}")
+    print("depth  old nodes  new nodes  ratio  old s  new s")
+    for depth, old_nodes, new_nodes, old_time, new_time in benchmark(range(args.min_depth, args.max_depth + 1),
+                                                                     seed=args.seed):
+        print(f"{depth:5d}  {old_nodes:9,d}  {new_nodes:9,d}  {old_nodes / new_nodes:5.1f}"
+              f"  {old_time:5.2f}  {new_time:5.2f}")
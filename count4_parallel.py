@@ -0,0 +1,194 @@
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from count4 import (AI, COLS, MAX_DEPTH, PLAYER, MoveOrdering, SearchAborted, SearchBudget, TranspositionTable,
+                    create_board, get_valid_locations, minimax, winning_move)
+
+# Root-parallel search for Connect Four.  The root moves are tried centre
+# first; the first one is searched on its own to get a real alpha (Young
+# Brothers Wait applied at the root) and the rest are split across a process
+# pool.  Every worker publishes an improved score through a shared alpha and
+# checks it while searching: a root move whose window another worker has
+# narrowed restarts with the new alpha, reusing its table entries.
+
+# Per-process state, set up by _init_worker in pool processes.
+_shared_alpha = None
+_table = None
+_ordering = None
+_search_id = None
+
+def _init_worker(shared_alpha):
+    global _shared_alpha, _table, _ordering
+    _shared_alpha = shared_alpha
+    _table = TranspositionTable()
+    _ordering = MoveOrdering()
+
+class _SharedAlphaBudget(SearchBudget):
+    # Aborts the search once the shared alpha has risen above ``alpha``,
+    # read every 1024 nodes like SearchBudget's clock.
+    def __init__(self, alpha):
+        super().__init__()
+        self.alpha = alpha
+
+    def tick(self):
+        self.nodes += 1
+        if not self.nodes & 1023 and _shared_alpha.value > self.alpha:
+            raise SearchAborted
+
+def root_order(board):
+    """Valid root columns, centre first."""
+    return sorted(get_valid_locations(board), key=lambda c: abs(c - COLS // 2))
+
+def _search_root_move(board, col, depth, alpha, table, ordering, budget=None):
+    row = board.play(col, AI)
+    try:
+        return minimax(board, depth - 1, alpha, math.inf, False, table, budget, (row, col), ordering)[1]
+    finally:
+        board.undo(col, AI)
+
+def _pool_task(board, col, depth, search_id):
+    global _search_id
+    if search_id != _search_id:
+        # First task of a new search in this process.
+        _search_id = search_id
+        _table.new_search()
+        _ordering.new_search()
+    while True:
+        alpha = _shared_alpha.value
+        try:
+            # An aborted search leaves its moves on the board, so each
+            # attempt gets a fresh copy.
+            score = _search_root_move(board.copy(), col, depth, alpha, _table, _ordering, _SharedAlphaBudget(alpha))
+            break
+        except SearchAborted:
+            pass
+    with _shared_alpha.get_lock():
+        if score > _shared_alpha.value:
+            _shared_alpha.value = score
+    return col, alpha, score
+
+def _pick_best(order, results):
+    # A move whose score did not beat the alpha it was searched with only
+    # has an upper bound, so it can never be chosen.  The first move is
+    # always searched with alpha = -inf.  Ties go to the earlier root move.
+    best_col, best_score = None, -math.inf
+    for col in order:
+        alpha, score = results[col]
+        if score > alpha and score > best_score:
+            best_col, best_score = col, score
+    return best_col, best_score
+
+class ParallelSearch:
+    """Fixed-depth root-parallel search for the AI.
+
+    ``workers`` defaults to the CPU count.  With one worker no pool is
+    created and the root moves are searched in order in this process, which
+    is fully deterministic.  Use as a context manager or call close().
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.table = TranspositionTable()
+        self.ordering = MoveOrdering()
+        self.search_id = 0
+        self.executor = None
+        if self.workers > 1:
+            self.shared_alpha = multiprocessing.Value("d", -math.inf)
+            self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                initargs=(self.shared_alpha,))
+
+    def search(self, board, depth=MAX_DEPTH):
+        """Returns ``(col, score)`` for the AI to move on ``board``."""
+        if winning_move(board, AI) or winning_move(board, PLAYER):
+            return minimax(board, depth, -math.inf, math.inf, True)
+        order = root_order(board)
+        if not order:
+            return None, 0
+        if self.executor is None:
+            return self._search_serial(board.copy(), order, depth)
+        return self._search_parallel(board, order, depth)
+
+    def _search_serial(self, board, order, depth):
+        self.table.new_search()
+        self.ordering.new_search()
+        results = {}
+        alpha = -math.inf
+        for col in order:
+            score = _search_root_move(board, col, depth, alpha, self.table, self.ordering)
+            results[col] = (alpha, score)
+            alpha = max(alpha, score)
+        return _pick_best(order, results)
+
+    def _search_parallel(self, board, order, depth):
+        self.shared_alpha.value = -math.inf
+        self.search_id += 1
+        first = self.executor.submit(_pool_task, board, order[0], depth, self.search_id).result()
+        results = {first[0]: first[1:]}
+        futures = [self.executor.submit(_pool_task, board, col, depth, self.search_id) for col in order[1:]]
+        for future in futures:
+            col, alpha, score = future.result()
+            results[col] = (alpha, score)
+        return _pick_best(order, results)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Fixed positions for benchmarking, as column sequences played from the
+# empty board with the player moving first.
+BENCH_POSITIONS = [
+    [],
+    [3],
+    [3, 3, 2],
+    [3, 2, 4, 4, 2],
+    [3, 3, 3, 4, 2, 2, 4],
+    [0, 6, 3, 3, 4, 2, 2, 4, 5],
+]
+
+def position_from_moves(moves):
+    board = create_board()
+    piece = PLAYER
+    for col in moves:
+        board.play(col, piece)
+        piece = AI if piece == PLAYER else PLAYER
+    return board
+
+def benchmark(depth, max_workers, positions=BENCH_POSITIONS):
+    """Times a fixed-depth search of every bench position with 1..max_workers
+    workers and returns ``[(workers, seconds, speedup), ...]``."""
+    boards = [position_from_moves(moves) for moves in positions]
+    rows = []
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        with ParallelSearch(workers) as search:
+            search.search(boards[0], 1)  # start the pool processes untimed
+            start = time.perf_counter()
+            for board in boards:
+                search.search(board, depth)
+            elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = elapsed
+        rows.append((workers, elapsed, baseline / elapsed))
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark root-parallel Connect Four search.")
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="highest worker count to measure")
+    args = parser.parse_args()
+    print(f"depth {args.depth}, {len(BENCH_POSITIONS)} positions")
+    print("workers  seconds  speedup")
+    for workers, elapsed, speedup in benchmark(args.depth, args.workers):
+        print(f"{workers:7d}  {elapsed:7.2f}  {speedup:6.2f}x")
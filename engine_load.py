@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+
+import count4
+import ticmul
+from tournament import TIC_LINES, percentile
+
+# Load generator for engine_server.py.  Opens --connections connections,
+# keeps up to --pipeline requests outstanding on each, and sends --requests
+# move requests drawn from --positions random positions (fewer positions
+# than requests exercises the shared cache).  Reports requests/sec and
+# latency percentiles as seen by the client.
+
+def random_c4_grid(rng):
+    board = count4.create_board()
+    piece = count4.PLAYER
+    for _ in range(rng.randint(0, 20)):
+        col = rng.choice(count4.get_valid_locations(board))
+        row = board.play(col, piece)
+        if count4.winning_move_at(board, row, col, piece):
+            board.undo(col, piece)
+            break
+        piece = count4.AI if piece == count4.PLAYER else count4.PLAYER
+    return [[board.get(r, c) for c in range(count4.COLS)] for r in range(count4.ROWS)]
+
+def random_tic_cells(rng):
+    # X moved first and it is O's (the engine's) turn, with no winner yet.
+    cells = [ticmul.EMPTY] * 9
+    for n in range(rng.choice((1, 3, 5, 7))):
+        symbol = ticmul.HUMAN_PLAYER_1 if n % 2 == 0 else ticmul.AI_PLAYER
+        cells[rng.choice([i for i, cell in enumerate(cells) if cell == ticmul.EMPTY])] = symbol
+        if any(all(cells[i] == symbol for i in line) for line in TIC_LINES):
+            return random_tic_cells(rng)
+    return "".join(cells)
+
+def make_requests(game, positions, depth, seed=0):
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(positions):
+        if game == "c4":
+            request = {"game": "c4", "board": random_c4_grid(rng), "depth": depth}
+        else:
+            request = {"game": game, "board": random_tic_cells(rng)}
+        requests.append(request)
+    return requests
+
+async def _connect(host, port, unix):
+    if unix:
+        return await asyncio.open_unix_connection(unix, limit=1 << 20)
+    return await asyncio.open_connection(host, port, limit=1 << 20)
+
+async def _run_connection(host, port, unix, source, pipeline, deadline_ms, results):
+    # ``source`` hands out (id, request) pairs shared by all connections.
+    reader, writer = await _connect(host, port, unix)
+    sent = {}
+    window = asyncio.Semaphore(pipeline)
+
+    async def receive():
+        while sent:
+            response = json.loads(await reader.readline())
+            window.release()
+            start = sent.pop(response["id"])
+            results.append((time.perf_counter() - start, response))
+
+    receiver = None
+    for request_id, request in source:
+        await window.acquire()
+        sent[request_id] = time.perf_counter()
+        payload = dict(request, id=request_id)
+        if deadline_ms:
+            payload["deadline_ms"] = deadline_ms
+        writer.write(json.dumps(payload).encode() + b"\n")
+        await writer.drain()
+        if receiver is None or receiver.done():
+            receiver = asyncio.ensure_future(receive())
+    if receiver is not None:
+        await receiver
+    writer.close()
+
+async def server_stats(host="127.0.0.1", port=8765, unix=None):
+    reader, writer = await _connect(host, port, unix)
+    writer.write(b'{"id": 0, "op": "stats"}\n')
+    response = json.loads(await reader.readline())
+    writer.close()
+    return response
+
+async def run_load(requests, total, connections=8, pipeline=4, host="127.0.0.1", port=8765, unix=None,
+                   deadline_ms=None):
+    """Sends ``total`` requests cycling through ``requests`` and returns a
+    summary dict with requests/sec, latency percentiles (ms) and errors."""
+    source = zip(range(total), itertools.cycle(requests))
+    results = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_run_connection(host, port, unix, source, pipeline, deadline_ms, results)
+                           for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    latencies = [latency * 1000 for latency, _ in results]
+    errors = {}
+    for _, response in results:
+        if "error" in response:
+            errors[response["error"]] = errors.get(response["error"], 0) + 1
+    return {
+        "requests": len(results), "seconds": elapsed, "rps": len(results) / elapsed,
+        "p50": percentile(latencies, 50), "p99": percentile(latencies, 99), "max": max(latencies, default=0.0),
+        "cached": sum(1 for _, response in results if response.get("cached")),
+        "errors": errors,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate load against engine_server.py.")
+    parser.add_argument("game", choices=("c4", "tic", "ticmul"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--positions", type=int, default=200, help="distinct random positions to cycle through")
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--pipeline", type=int, default=4, help="outstanding requests per connection")
+    parser.add_argument("--depth", type=int, default=count4.MAX_DEPTH, help="c4 search depth")
+    parser.add_argument("--deadline-ms", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    requests = make_requests(args.game, args.positions, args.depth, args.seed)
+    summary = asyncio.run(run_load(requests, args.requests, args.connections, args.pipeline,
+                                   args.host, args.port, args.unix, args.deadline_ms))
+    stats = asyncio.run(server_stats(args.host, args.port, args.unix))
+    print(f"{summary['requests']} requests in {summary['seconds']:.2f}s: {summary['rps']:,.1f} req/s")
+    print(f"latency ms: p50 {summary['p50']:.2f}  p99 {summary['p99']:.2f}  max {summary['max']:.2f}")
+    print(f"cached responses: {summary['cached']}  errors: {summary['errors'] or 'none'}")
+    print(f"server cache: {stats['cache_hits']} hits, {stats['cache_misses']} misses, {stats['cache_size']} entries")
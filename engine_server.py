@@ -0,0 +1,321 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import count4
+import tic
+import ticmul
+
+# Local move server: many games share one process pool and one result cache.
+#
+# The protocol is newline-delimited JSON over TCP or a Unix socket.  Each
+# request line gets one response line carrying the same "id"; a connection
+# may pipeline requests and responses can come back out of order.
+#
+#   {"id": 1, "game": "c4", "board": [[0, 0, 0, 0, 0, 0, 0], ...], "depth": 6}
+#   {"id": 2, "game": "ticmul", "board": "X   O    "}
+#   {"id": 3, "game": "tic", "board": "X   O    X", "size": 3, "k": 3, "depth": null}
+#   {"id": 4, "op": "stats"}
+#
+#   {"id": 1, "move": 3, "score": 12.0, "cached": false, "ms": 41.2}
+#   {"id": 9, "error": "deadline exceeded"}
+#
+# The engine always moves for the AI: count4.AI (2) in a c4 grid (row 0 at
+# the top, as in the GUI) and "O" on tic-tac-toe boards.  "deadline_ms"
+# bounds the time a request may take, waiting included; c4 and tic searches
+# stop themselves at the deadline.
+
+DEFAULT_DEADLINE = 5.0
+MAX_DEADLINE = 60.0
+RESULT_CACHE_SIZE = 100000
+MAX_TIC_SIZE = 15
+# Deepest search allowed on tic boards larger than 3x3 (3x3 may search to the end).
+MAX_TIC_DEPTH = 4
+
+# ----------- Worker processes -----------
+_c4_table = None
+
+def _init_worker():
+    global _c4_table
+    _c4_table = count4.TranspositionTable()
+    ticmul.init_move_table()
+
+def _c4_board(grid):
+    board = count4.create_board()
+    for col in range(count4.COLS):
+        for row in range(count4.ROWS - 1, -1, -1):
+            if grid[row][col] == count4.EMPTY:
+                break
+            board.play(col, grid[row][col])
+    return board
+
+def _tic_board(cells, size, k):
+    board = tic.Board(size, k)
+    for i, cell in enumerate(cells):
+        if cell != tic.EMPTY:
+            board.place(i, cell)
+    return board
+
+def _run_task(task, time_limit):
+    # Runs in a pool process.  Deadline misses come back as an error dict so
+    # nothing is cached for them.
+    game = task[0]
+    if game == "c4":
+        _, grid, depth = task
+        board = _c4_board(grid)
+        _c4_table.new_search()
+        try:
+            col, score = count4.minimax(board, depth, -math.inf, math.inf, True, _c4_table,
+                                        count4.SearchBudget(time_limit), None, count4.MoveOrdering())
+        except count4.SearchAborted:
+            return {"error": "deadline exceeded"}
+        return {"move": col, "score": score}
+    if game == "ticmul":
+        move = ticmul.find_best_move(list(task[1]))
+        return {"move": move if move != -1 else None}
+    _, cells, size, k, depth = task
+    try:
+        move = tic.find_best_move(_tic_board(cells, size, k), depth, tic.Deadline(time_limit))
+    except tic.SearchTimeout:
+        return {"error": "deadline exceeded"}
+    return {"move": move if move != -1 else None}
+
+# ----------- Request parsing -----------
+def _cells(request, count, symbols):
+    board = request.get("board")
+    if not isinstance(board, (str, list)) or len(board) != count or any(cell not in symbols for cell in board):
+        raise ValueError(f"board must be {count} cells of {sorted(symbols)}")
+    return tuple(board)
+
+def parse_request(request):
+    """Validates a move request and returns ``(cache_key, task)``.
+
+    Raises ValueError with a message for the client on bad input.
+    """
+    game = request.get("game")
+    if game == "c4":
+        grid = request.get("board")
+        if (not isinstance(grid, list) or len(grid) != count4.ROWS
+                or any(not isinstance(row, list) or len(row) != count4.COLS for row in grid)
+                # type() check: 1.0 and true compare equal to 1 but are not cells.
+                or any(type(cell) is not int or cell not in (count4.EMPTY, count4.PLAYER, count4.AI)
+                       for row in grid for cell in row)):
+            raise ValueError(f"board must be {count4.ROWS} rows of {count4.COLS} cells of 0, 1 or 2")
+        for col in range(count4.COLS):
+            column = [grid[row][col] for row in range(count4.ROWS - 1, -1, -1)]
+            if count4.EMPTY in column and any(column[column.index(count4.EMPTY):]):
+                raise ValueError(f"column {col} has a floating piece")
+        depth = request.get("depth", count4.MAX_DEPTH)
+        if not isinstance(depth, int) or not 1 <= depth <= count4.ROWS * count4.COLS:
+            raise ValueError("depth must be a positive integer")
+        grid = tuple(tuple(row) for row in grid)
+        return (game, grid, depth), (game, grid, depth)
+    if game == "ticmul":
+        cells = _cells(request, 9, {ticmul.EMPTY, ticmul.HUMAN_PLAYER_1, ticmul.AI_PLAYER})
+        return (game, cells), (game, cells)
+    if game == "tic":
+        size = request.get("size", tic.SIZE)
+        k = request.get("k", min(size, 5) if isinstance(size, int) else None)
+        if not isinstance(size, int) or not isinstance(k, int) or not 1 <= k <= size <= MAX_TIC_SIZE:
+            raise ValueError(f"need 1 <= k <= size <= {MAX_TIC_SIZE}")
+        depth = request.get("depth", tic.HEURISTIC_DEPTH if size == 3 else 3)
+        if depth is not None and (not isinstance(depth, int) or depth < 1):
+            raise ValueError("depth must be a positive integer or null")
+        if size > 3 and (depth is None or depth > MAX_TIC_DEPTH):
+            raise ValueError(f"depth must be at most {MAX_TIC_DEPTH} on boards larger than 3x3")
+        cells = _cells(request, size * size, {tic.EMPTY, tic.HUMAN, tic.AI})
+        return (game, cells, size, k, depth), (game, cells, size, k, depth)
+    raise ValueError("game must be c4, tic or ticmul")
+
+# ----------- Server -----------
+class ResultCache:
+    """LRU of finished search results shared by every connection."""
+    def __init__(self, max_size=RESULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+class EngineServer:
+    """Serves move requests from a process pool.
+
+    At most ``max_running`` searches run at once; a request that finds more
+    than ``max_queued`` others already waiting is refused straight away.
+    Identical requests that arrive while one is being searched wait for the
+    same result.  A search that misses its deadline keeps its slot until the
+    worker finishes (count4 and tic searches stop themselves at the
+    deadline, ticmul answers from its table), and a late result still goes
+    into the cache.
+    """
+
+    def __init__(self, workers=None, max_running=None, max_queued=1000, cache_size=RESULT_CACHE_SIZE,
+                 default_deadline=DEFAULT_DEADLINE):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker)
+        self.slots = asyncio.Semaphore(max_running or self.workers * 2)
+        self.max_queued = max_queued
+        self.queued = 0
+        self.running = 0
+        self.cache = ResultCache(cache_size)
+        self.inflight = {}
+        self.default_deadline = default_deadline
+        self.served = 0
+        self.errors = 0
+
+    def stats(self):
+        return {
+            "served": self.served, "errors": self.errors,
+            "cache_hits": self.cache.hits, "cache_misses": self.cache.misses, "cache_size": len(self.cache.entries),
+            "queued": self.queued, "running": self.running, "inflight": len(self.inflight),
+        }
+
+    async def _search(self, key, task, deadline):
+        self.queued += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.queued -= 1
+        if deadline - time.monotonic() <= 0:
+            # Expired while queued: no worker would have time to search.
+            self.slots.release()
+            del self.inflight[key]
+            return {"error": "deadline exceeded"}
+        self.running += 1
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.pool, _run_task, task, max(0.0, deadline - time.monotonic()))
+
+        def release(_):
+            self.running -= 1
+            self.slots.release()
+        future.add_done_callback(release)
+        try:
+            result = await future
+        finally:
+            del self.inflight[key]
+        if "error" not in result:
+            self.cache.put(key, result)
+        return result
+
+    async def move(self, request):
+        """Answers one move request with a response dict (without "id")."""
+        start = time.monotonic()
+        deadline_ms = request.get("deadline_ms")
+        if deadline_ms is None:
+            timeout = self.default_deadline
+        elif isinstance(deadline_ms, (int, float)) and deadline_ms > 0:
+            timeout = min(deadline_ms / 1000, MAX_DEADLINE)
+        else:
+            raise ValueError("deadline_ms must be a positive number")
+        key, task = parse_request(request)
+
+        result = self.cache.get(key)
+        cached = result is not None
+        if result is None:
+            search = self.inflight.get(key)
+            if search is None:
+                if self.queued >= self.max_queued:
+                    return {"error": "server busy"}
+                search = asyncio.ensure_future(self._search(key, task, start + timeout))
+                self.inflight[key] = search
+            try:
+                # shield: a timed-out waiter must not cancel a search others share.
+                result = await asyncio.wait_for(asyncio.shield(search), start + timeout - time.monotonic())
+            except asyncio.TimeoutError:
+                return {"error": "deadline exceeded"}
+        return dict(result, cached=cached, ms=(time.monotonic() - start) * 1000)
+
+    async def _respond(self, line, writer, lock):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            request_id = request.get("id")
+            if request.get("op") == "stats":
+                response = self.stats()
+            else:
+                response = await self.move(request)
+        except ValueError as e:  # includes json.JSONDecodeError
+            response = {"error": str(e)}
+        except Exception as e:
+            response = {"error": f"internal error: {e!r}"}
+        if "error" in response:
+            self.errors += 1
+        else:
+            self.served += 1
+        response["id"] = request_id
+        async with lock:
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+
+    async def handle(self, reader, writer):
+        lock = asyncio.Lock()
+        pending = set()
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                task = asyncio.ensure_future(self._respond(line, writer, lock))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.wait(pending)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+async def serve(server, host="127.0.0.1", port=8765, unix=None):
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle, unix)
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+    # Start the workers (and build the ticmul table) before taking requests.
+    await asyncio.gather(*(asyncio.get_running_loop().run_in_executor(server.pool, time.sleep, 0)
+                           for _ in range(server.workers)))
+    print(f"serving on {unix or f'{host}:{port}'} with {server.workers} workers", flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve tic-tac-toe and Connect Four moves over JSON lines.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="search processes (default: CPU count)")
+    parser.add_argument("--max-running", type=int, default=None, help="searches at once (default: 2 per worker)")
+    parser.add_argument("--max-queued", type=int, default=1000, help="waiting searches before refusing requests")
+    parser.add_argument("--cache-size", type=int, default=RESULT_CACHE_SIZE)
+    parser.add_argument("--deadline", type=float, default=DEFAULT_DEADLINE,
+                        help="default per-request deadline in seconds")
+    args = parser.parse_args()
+    engine = EngineServer(args.workers, args.max_running, args.max_queued, args.cache_size, args.deadline)
+    try:
+        asyncio.run(serve(engine, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
@@ -0,0 +1,248 @@
+import importlib
+import json
+import time
+
+# Opt-in instrumentation for the game-tree searches in count4.py, tic.py and
+# ticmul.py.
+#
+#     with instrument("count4", log="moves.jsonl") as stats:
+#         count4.iterative_deepening(board, time_limit=0.5)
+#     print(stats.to_dict())
+#
+# While the block runs, the search function and its evaluation, move
+# generation and cache-probe helpers are swapped for recording wrappers in
+# their module (the recursion calls the search through its module global, so
+# every node is seen).  Outside the block the original functions are back in
+# place and the searches run exactly as before, with no checks or counters.
+# The swap is process-wide, so do not instrument a module while another
+# thread is searching with it.
+
+# What to wrap in each engine module.  ``args`` gives the positions of the
+# alpha, beta and maximizing arguments of the search function, and ``value``
+# extracts the score from its return value.  "eval" and "movegen" entries
+# are module functions or (class, method) pairs.  count4 and tic keep their
+# evaluation incremental, so the real evaluation work happens as moves are
+# made and unmade: their "eval" time includes Board.play/undo
+# (place/remove), which also apply the move itself, while score_position
+# and heuristic are only lookups.  "solver" names an exact solver run from
+# inside the search: its root function is timed and every call of its
+# recursive node function counts as a solver node (not a search node).
+TARGETS = {
+    "count4": {
+        "search": "minimax",
+        "args": (2, 3, 4),
+        "value": lambda result: result[1],
+        "eval": ["score_position", "winning_move", "winning_move_at", ("Board", "play"), ("Board", "undo")],
+        "movegen": ["get_valid_locations"],
+        "probe": [("TranspositionTable", "probe")],
+        "solver": ("solve_endgame", "_negamax"),
+    },
+    "tic": {
+        "search": "minimax_alpha_beta",
+        "args": (3, 4, 2),
+        "value": lambda result: result,
+        "eval": ["heuristic", ("Board", "place"), ("Board", "remove")],
+        "movegen": ["candidate_moves", "ordered_moves"],
+        "probe": [("SymmetryCache", "get")],
+    },
+    "ticmul": {
+        "search": "minimax_alpha_beta",
+        "args": (3, 4, 2),
+        "value": lambda result: result,
+        "eval": ["check_winner", "is_board_full"],
+        "movegen": ["get_empty_cells"],
+        "probe": [],
+    },
+}
+
+_active = set()
+
+class SearchStats:
+    """Counters collected while a search is instrumented.
+
+    ``nodes_by_ply[p]`` counts search calls made p plies below the outermost
+    call.  A cutoff is a node that searched at least one child and failed
+    high (max node, score >= beta) or low (min node, score <= alpha); a
+    first-move cutoff is one that needed only its first child.  Solver
+    nodes are counted separately in ``solver_nodes``; ``solver_time`` is
+    the time spent in the solver, which is excluded from the eval and
+    movegen times.
+    """
+
+    def __init__(self, engine, label=None):
+        self.engine = engine
+        self.label = label
+        self.nodes_by_ply = []
+        self.interior_nodes = 0
+        self.root_calls = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.eval_calls = 0
+        self.eval_time = 0.0
+        self.movegen_calls = 0
+        self.movegen_time = 0.0
+        self.solver_calls = 0
+        self.solver_time = 0.0
+        self.solver_nodes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.elapsed = 0.0
+
+    @property
+    def nodes(self):
+        return sum(self.nodes_by_ply)
+
+    @property
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def effective_branching_factor(self):
+        """Children searched per expanded node, after pruning."""
+        if not self.interior_nodes:
+            return 0.0
+        return (self.nodes - self.root_calls) / self.interior_nodes
+
+    @property
+    def nodes_per_sec(self):
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self):
+        return {
+            "engine": self.engine,
+            "label": self.label,
+            "nodes": self.nodes,
+            "nodes_by_ply": self.nodes_by_ply,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoff_rate,
+            "effective_branching_factor": self.effective_branching_factor,
+            "eval_calls": self.eval_calls,
+            "eval_seconds": self.eval_time,
+            "movegen_calls": self.movegen_calls,
+            "movegen_seconds": self.movegen_time,
+            "solver_calls": self.solver_calls,
+            "solver_seconds": self.solver_time,
+            "solver_nodes": self.solver_nodes,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "seconds": self.elapsed,
+            "nodes_per_sec": self.nodes_per_sec,
+        }
+
+def _search_wrapper(search, stats, target):
+    alpha_arg, beta_arg, max_arg = target["args"]
+    value_of = target["value"]
+    open_nodes = []  # children seen so far by each node on the call stack
+
+    def wrapper(*args):
+        ply = len(open_nodes)
+        if ply == len(stats.nodes_by_ply):
+            stats.nodes_by_ply.append(0)
+        stats.nodes_by_ply[ply] += 1
+        if open_nodes:
+            open_nodes[-1] += 1
+        else:
+            stats.root_calls += 1
+        open_nodes.append(0)
+        try:
+            result = search(*args)
+        finally:
+            children = open_nodes.pop()
+        if children:
+            stats.interior_nodes += 1
+            value = value_of(result)
+            if (value >= args[beta_arg]) if args[max_arg] else (value <= args[alpha_arg]):
+                stats.cutoffs += 1
+                if children == 1:
+                    stats.first_move_cutoffs += 1
+        return result
+    return wrapper
+
+def _timed_wrapper(fn, stats, kind, nesting):
+    # ``nesting`` is shared by all wrappers of one kind so helpers that call
+    # each other (tic.ordered_moves -> candidate_moves) are timed once.
+    def wrapper(*args):
+        if nesting[0]:
+            return fn(*args)
+        nesting[0] += 1
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            setattr(stats, kind + "_time", getattr(stats, kind + "_time") + time.perf_counter() - start)
+            setattr(stats, kind + "_calls", getattr(stats, kind + "_calls") + 1)
+            nesting[0] -= 1
+    return wrapper
+
+def _counting_wrapper(fn, stats):
+    def wrapper(*args):
+        stats.solver_nodes += 1
+        return fn(*args)
+    return wrapper
+
+def _probe_wrapper(probe, stats):
+    def wrapper(self, key):
+        entry = probe(self, key)
+        if entry is None:
+            stats.cache_misses += 1
+        else:
+            stats.cache_hits += 1
+        return entry
+    return wrapper
+
+class instrument:
+    """Context manager that records a SearchStats for one engine module.
+
+    ``log`` may be a path or an open text file; one JSON line with the stats
+    is appended to it when the block exits.
+    """
+
+    def __init__(self, engine, log=None, label=None):
+        if engine not in TARGETS:
+            raise ValueError(f"no instrumentation for engine {engine!r}")
+        self.engine = engine
+        self.log = log
+        self.stats = SearchStats(engine, label)
+        self._restore = []
+
+    def _swap(self, owner, name, replacement):
+        self._restore.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, replacement)
+
+    def __enter__(self):
+        if self.engine in _active:
+            raise RuntimeError(f"{self.engine} is already instrumented")
+        _active.add(self.engine)
+        module = importlib.import_module(self.engine)
+        target = TARGETS[self.engine]
+        stats = self.stats
+        self._swap(module, target["search"], _search_wrapper(getattr(module, target["search"]), stats, target))
+        for kind in ("eval", "movegen"):
+            nesting = [0]
+            for name in target[kind]:
+                owner, name = (getattr(module, name[0]), name[1]) if isinstance(name, tuple) else (module, name)
+                self._swap(owner, name, _timed_wrapper(getattr(owner, name), stats, kind, nesting))
+        if "solver" in target:
+            solve, node = target["solver"]
+            self._swap(module, solve, _timed_wrapper(getattr(module, solve), stats, "solver", [0]))
+            self._swap(module, node, _counting_wrapper(getattr(module, node), stats))
+        for class_name, method in target["probe"]:
+            cls = getattr(module, class_name)
+            self._swap(cls, method, _probe_wrapper(getattr(cls, method), stats))
+        self._start = time.perf_counter()
+        return stats
+
+    def __exit__(self, *exc):
+        self.stats.elapsed = time.perf_counter() - self._start
+        for owner, name, original in reversed(self._restore):
+            setattr(owner, name, original)
+        self._restore = []
+        _active.discard(self.engine)
+        if self.log is not None:
+            line = json.dumps(self.stats.to_dict()) + "\n"
+            if isinstance(self.log, str):
+                with open(self.log, "a", encoding="utf-8") as f:
+                    f.write(line)
+            else:
+                self.log.write(line)
+        return False
@@ -1,107 +1,438 @@
+import argparse
 import math
+import random
+import time
+from collections import OrderedDict
+from functools import lru_cache
 
 HUMAN = 'X'
 AI = 'O'
 EMPTY = ' '
+SIZE = 3
+K = 3
+WIN_SCORE = 100
+# Depth at which the search stops and scores with heuristic(); None searches
+# every line to the end of the game.  Boards larger than 3x3 need a limit.
+HEURISTIC_DEPTH = None
+# Moves considered are the empty cells within this many cells of a stone.
+CANDIDATE_RADIUS = 2
+CACHE_SIZE = 50000
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+class Geometry:
+    """Everything about an N x N, k-in-a-row board that never changes.
+
+    Holds the winning lines (as cell tuples), the lines through
+    each cell, the 8 symmetries of the square, Zobrist keys, each cell's
+    candidate neighbourhood and the per-line heuristic tables.
+
+    Lines are not bitmasks: Board never tests a line against the stones.
+    It keeps a stone count per line, updated through cell_lines on every
+    move: a win is a count reaching k and the heuristic changes by one
+    table lookup per line through the cell, with nothing to mask.
+    """
+    def __init__(self, size, k):
+        self.size = size
+        self.k = k
+        self.cells = size * size
+        self.center = (size // 2) * size + size // 2
+
+        self.lines = []
+        for r in range(size):
+            for c in range(size):
+                for dr, dc in DIRECTIONS:
+                    if 0 <= r + dr * (k - 1) < size and 0 <= c + dc * (k - 1) < size:
+                        self.lines.append(tuple((r + dr * i) * size + c + dc * i for i in range(k)))
+        self.cell_lines = [[] for _ in range(self.cells)]
+        for n, line in enumerate(self.lines):
+            for i in line:
+                self.cell_lines[i].append(n)
+
+        # symmetries[s][j] is the cell of the board that lands on cell j of
+        # the transformed board; inverse[s][i] is where cell i lands.
+        self.symmetries = []
+        for swap in (False, True):
+            for flip_r in (False, True):
+                for flip_c in (False, True):
+                    perm = []
+                    for i in range(self.cells):
+                        r, c = divmod(i, size)
+                        if swap:
+                            r, c = c, r
+                        if flip_r:
+                            r = size - 1 - r
+                        if flip_c:
+                            c = size - 1 - c
+                        perm.append(r * size + c)
+                    self.symmetries.append(perm)
+        self.inverse = []
+        for perm in self.symmetries:
+            inv = [0] * self.cells
+            for j, i in enumerate(perm):
+                inv[i] = j
+            self.inverse.append(inv)
+
+        rng = random.Random(size * 100 + k)
+        self.zobrist = {player: [rng.getrandbits(64) for _ in range(self.cells)] for player in (AI, HUMAN)}
+
+        self.neighbours = []
+        for i in range(self.cells):
+            r, c = divmod(i, size)
+            mask = 0
+            for rr in range(max(0, r - CANDIDATE_RADIUS), min(size, r + CANDIDATE_RADIUS + 1)):
+                for cc in range(max(0, c - CANDIDATE_RADIUS), min(size, c + CANDIDATE_RADIUS + 1)):
+                    mask |= 1 << (rr * size + cc)
+            self.neighbours.append(mask)
+
+        # A line holding only one side's pieces is worth 10 ** (count - 1)
+        # to that side (1 and 10 on the classic board); mixed lines are dead.
+        # value[ai][human] is the line's worth to the AI.
+        value = [[0] * (k + 1) for _ in range(k + 1)]
+        for n in range(1, k + 1):
+            value[n][0] = 10 ** (n - 1)
+            value[0][n] = -10 ** (n - 1)
+        # place_delta[player][own][opp]: change of the AI score when
+        # ``player`` adds a piece to a line with ``own``/``opp`` pieces.
+        self.place_delta = {
+            AI: [[value[own + 1][opp] - value[own][opp] if own < k else 0 for opp in range(k + 1)]
+                 for own in range(k + 1)],
+            HUMAN: [[value[opp][own + 1] - value[opp][own] if own < k else 0 for opp in range(k + 1)]
+                    for own in range(k + 1)],
+        }
+        # Non-terminal scores stay within +-max_heuristic; wins score above it.
+        self.max_heuristic = len(self.lines) * 10 ** (k - 2)
+        self.win_score = max(WIN_SCORE, self.max_heuristic + self.cells + 1)
+
+@lru_cache(maxsize=None)
+def geometry(size, k):
+    return Geometry(size, k)
+
+class Board:
+    """An N x N board that keeps per-line piece counts, the heuristic score,
+    win counts and the Zobrist hashes of all 8 symmetric images up to date
+    as pieces are placed and removed."""
+    def __init__(self, size=SIZE, k=K):
+        self.geo = geometry(size, k)
+        self.size = size
+        self.k = k
+        self.cells = [EMPTY] * self.geo.cells
+        self.bits = {AI: 0, HUMAN: 0}
+        self.line_counts = {AI: [0] * len(self.geo.lines), HUMAN: [0] * len(self.geo.lines)}
+        self.wins = {AI: 0, HUMAN: 0}
+        self.score = 0
+        self.hashes = [0] * 8
+        self.stones = []
+
+    def __getitem__(self, i):
+        return self.cells[i]
+
+    def __len__(self):
+        return len(self.cells)
+
+    def place(self, i, player):
+        geo = self.geo
+        opponent = HUMAN if player == AI else AI
+        self.cells[i] = player
+        self.bits[player] |= 1 << i
+        own = self.line_counts[player]
+        opp = self.line_counts[opponent]
+        delta_table = geo.place_delta[player]
+        k = self.k
+        delta = 0
+        for n in geo.cell_lines[i]:
+            c = own[n] + 1
+            delta += delta_table[c - 1][opp[n]]
+            own[n] = c
+            if c == k:
+                self.wins[player] += 1
+        self.score += delta
+        keys = geo.zobrist[player]
+        hashes = self.hashes
+        for s, inv in enumerate(geo.inverse):
+            hashes[s] ^= keys[inv[i]]
+        self.stones.append(i)
+
+    def remove(self, i, player):
+        geo = self.geo
+        opponent = HUMAN if player == AI else AI
+        self.cells[i] = EMPTY
+        self.bits[player] &= ~(1 << i)
+        own = self.line_counts[player]
+        opp = self.line_counts[opponent]
+        delta_table = geo.place_delta[player]
+        k = self.k
+        delta = 0
+        for n in geo.cell_lines[i]:
+            c = own[n]
+            if c == k:
+                self.wins[player] -= 1
+            c -= 1
+            own[n] = c
+            delta += delta_table[c][opp[n]]
+        self.score -= delta
+        keys = geo.zobrist[player]
+        hashes = self.hashes
+        for s, inv in enumerate(geo.inverse):
+            hashes[s] ^= keys[inv[i]]
+        if self.stones[-1] == i:
+            self.stones.pop()
+        else:
+            self.stones.remove(i)
+
+    def copy(self):
+        other = Board(self.size, self.k)
+        for i in self.stones:
+            other.place(i, self.cells[i])
+        return other
+
+class SymmetryCache:
+    """LRU cache of search results keyed on the canonical board.
+
+    Values are stored relative to the node (a win found n plies below is
+    the win score minus n), so an entry is valid wherever in the tree the
+    position turns up.  Best moves are stored in canonical coordinates.
+    """
+    def __init__(self, max_size=CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+CACHE = SymmetryCache()
+
+def canonical_form(board):
+    """Returns (key, s): the smallest of the 8 symmetric hashes and the
+    symmetry it came from.  Cell i of the board is cell
+    ``board.geo.inverse[s][i]`` of the canonical image."""
+    hashes = board.hashes
+    s = min(range(8), key=hashes.__getitem__)
+    return hashes[s], s
+
+def _to_node(board, score, depth):
+    # Re-bases a win/loss score from "found at ``depth``" to "found here".
+    if score > board.geo.max_heuristic:
+        return score + depth
+    if score < -board.geo.max_heuristic:
+        return score - depth
+    return score
+
+def _from_node(board, score, depth):
+    if score > board.geo.max_heuristic:
+        return score - depth
+    if score < -board.geo.max_heuristic:
+        return score + depth
+    return score
+
+def _cache_key(board, depth, is_maximizing, max_depth):
+    key, s = canonical_form(board)
+    remaining = None if max_depth is None else max_depth - depth
+    return (board.size, board.k, key, is_maximizing, remaining), s
 
 def print_board(board):
-    print('-------------')
-    for i in range(3):
-        print(f'| {board[i*3]} | {board[i*3+1]} | {board[i*3+2]} |')
-        print('-------------')
+    size = board.size
+    rule = '-' * (4 * size + 1)
+    print(rule)
+    for r in range(size):
+        print('| ' + ' | '.join(board[r * size + c] for c in range(size)) + ' |')
+        print(rule)
 
 def get_empty_cells(board):
-    return [i for i, cell in enumerate(board) if cell == EMPTY]
+    return [i for i, cell in enumerate(board.cells) if cell == EMPTY]
+
+def candidate_moves(board):
+    """Empty cells within CANDIDATE_RADIUS of a stone, in index order
+    (every empty cell on the 3x3 board)."""
+    if not board.stones:
+        return [board.geo.center]
+    neighbours = board.geo.neighbours
+    near = 0
+    for i in board.stones:
+        near |= neighbours[i]
+    near &= ~(board.bits[AI] | board.bits[HUMAN])
+    moves = []
+    while near:
+        low = near & -near
+        moves.append(low.bit_length() - 1)
+        near ^= low
+    return moves or get_empty_cells(board)
+
+def ordered_moves(board, player):
+    """candidate_moves sorted by how much each one helps ``player`` right now."""
+    scored = []
+    for i in candidate_moves(board):
+        board.place(i, player)
+        scored.append((board.score, i))
+        board.remove(i, player)
+    scored.sort(key=lambda item: item[0], reverse=(player == AI))
+    return [i for _, i in scored]
 
 def check_winner(board, player):
-    win_conditions = [
-        [0, 1, 2], [3, 4, 5], [6, 7, 8],
-        [0, 3, 6], [1, 4, 7], [2, 5, 8],
-        [0, 4, 8], [2, 4, 6]
-    ]
-    for condition in win_conditions:
-        if board[condition[0]] == player and \
-           board[condition[1]] == player and \
-           board[condition[2]] == player:
-            return True
-    return False
+    return board.wins[player] > 0
 
 def is_board_full(board):
-    return EMPTY not in board
+    return len(board.stones) == len(board.cells)
 
 #Heuristic function
 def heuristic(board):
-    score = 0
-    win_conditions = [
-        [0, 1, 2], [3, 4, 5], [6, 7, 8],
-        [0, 3, 6], [1, 4, 7], [2, 5, 8],
-        [0, 4, 8], [2, 4, 6]
-    ]
-    for line in win_conditions:
-        line_values = [board[i] for i in line]
-        ai_count = line_values.count(AI)
-        human_count = line_values.count(HUMAN)
-        if ai_count > 0 and human_count == 0:
-            if ai_count == 2:
-                score += 10
-            else:
-                score += 1
-        elif human_count > 0 and ai_count == 0:
-            if human_count == 2:
-                score -= 10
-            else:
-                score -= 1
-    return score
+    # Sum over open lines of 10 ** (pieces - 1), AI lines positive and
+    # human lines negative; maintained incrementally by Board.
+    return board.score
+
+class SearchTimeout(Exception):
+    """Raised inside the search once its Deadline has passed."""
+
+class Deadline:
+    """Wall-clock limit checked at every node of a search."""
+    def __init__(self, time_limit):
+        self.deadline = time.perf_counter() + time_limit
+        self.nodes = 0
+
+    def tick(self):
+        self.nodes += 1
+        if time.perf_counter() > self.deadline:
+            raise SearchTimeout
 
 # Minimax now uses heuristic when not terminal
-def minimax_alpha_beta(board, depth, is_maximizing, alpha, beta):
-    if check_winner(board, AI):
-        return 100 - depth  
-    if check_winner(board, HUMAN):
-        return -100 + depth  
+def minimax_alpha_beta(board, depth, is_maximizing, alpha, beta, max_depth=HEURISTIC_DEPTH, deadline=None):
+    if deadline is not None:
+        deadline.tick()
+    win_score = board.geo.win_score
+    if board.wins[AI]:
+        return win_score - depth
+    if board.wins[HUMAN]:
+        return -win_score + depth
     if is_board_full(board):
         return 0
-    
-    if depth >= 3:  
+
+    if max_depth is not None and depth >= max_depth:
         return heuristic(board)
 
+    key, s = _cache_key(board, depth, is_maximizing, max_depth)
+    perm = board.geo.symmetries[s]
+    entry = CACHE.get(key)
+    player = AI if is_maximizing else HUMAN
+    if max_depth is not None and max_depth - depth > 1:
+        cells = ordered_moves(board, player)
+    else:
+        cells = candidate_moves(board)
+    if entry is not None:
+        flag, value, move = entry
+        value = _from_node(board, value, depth)
+        if flag == EXACT:
+            return value
+        if flag == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if beta <= alpha:
+            return value
+        # Try the cached best move (mapped back onto this board) first.
+        if perm[move] in cells:
+            cells.remove(perm[move])
+            cells.insert(0, perm[move])
+    window_alpha, window_beta = alpha, beta
+
+    best_move = cells[0]
     if is_maximizing:
         best_score = -math.inf
-        for cell_index in get_empty_cells(board):
-            board[cell_index] = AI
-            score = minimax_alpha_beta(board, depth + 1, False, alpha, beta)
-            board[cell_index] = EMPTY
-            best_score = max(best_score, score)
+        for cell_index in cells:
+            board.place(cell_index, AI)
+            score = minimax_alpha_beta(board, depth + 1, False, alpha, beta, max_depth, deadline)
+            board.remove(cell_index, AI)
+            if score > best_score:
+                best_score = score
+                best_move = cell_index
             alpha = max(alpha, best_score)
             if beta <= alpha:
                 break
-        return best_score
     else:
         best_score = math.inf
-        for cell_index in get_empty_cells(board):
-            board[cell_index] = HUMAN
-            score = minimax_alpha_beta(board, depth + 1, True, alpha, beta)
-            board[cell_index] = EMPTY
-            best_score = min(best_score, score)
+        for cell_index in cells:
+            board.place(cell_index, HUMAN)
+            score = minimax_alpha_beta(board, depth + 1, True, alpha, beta, max_depth, deadline)
+            board.remove(cell_index, HUMAN)
+            if score < best_score:
+                best_score = score
+                best_move = cell_index
             beta = min(beta, best_score)
             if beta <= alpha:
                 break
-        return best_score
 
-def find_best_move(board):
+    if best_score <= window_alpha:
+        flag = UPPER
+    elif best_score >= window_beta:
+        flag = LOWER
+    else:
+        flag = EXACT
+    CACHE.put(key, (flag, _to_node(board, best_score, depth), board.geo.inverse[s][best_move]))
+    return best_score
+
+def find_best_move(board, max_depth=HEURISTIC_DEPTH, deadline=None):
+    # The root sits one ply above the depth-0 children searched below.
+    # With a Deadline the search raises SearchTimeout when time runs out,
+    # leaving ``board`` with the stones of the abandoned line on it.
+    key, s = _cache_key(board, -1, True, max_depth)
+    entry = CACHE.get(key)
+    if entry is not None and entry[0] == EXACT:
+        return board.geo.symmetries[s][entry[2]]
     best_score = -math.inf
     best_move = -1
-    for cell_index in get_empty_cells(board):
-        board[cell_index] = AI
-        score = minimax_alpha_beta(board, 0, False, -math.inf, math.inf)
-        board[cell_index] = EMPTY
+    cells = candidate_moves(board) if max_depth is None else ordered_moves(board, AI)
+    for cell_index in cells:
+        board.place(cell_index, AI)
+        # Moves that cannot beat the best so far only need to prove it.
+        score = minimax_alpha_beta(board, 0, False, best_score, math.inf, max_depth, deadline)
+        board.remove(cell_index, AI)
         if score > best_score:
             best_score = score
             best_move = cell_index
+    if best_move != -1:
+        CACHE.put(key, (EXACT, _to_node(board, best_score, -1), board.geo.inverse[s][best_move]))
     return best_move
 
+def read_move(board):
+    # Accepts a cell number (1..N*N) or "row col" (both 1-based).
+    parts = input(f"Enter your move (1-{len(board)} or 'row col'): ").split()
+    numbers = [int(part) for part in parts]
+    if len(numbers) == 2:
+        return (numbers[0] - 1) * board.size + numbers[1] - 1
+    if len(numbers) == 1:
+        return numbers[0] - 1
+    raise ValueError
+
 def main():
-    board = [EMPTY] * 9
+    parser = argparse.ArgumentParser(description="Play N x N, k-in-a-row against the AI.")
+    parser.add_argument("--size", type=int, default=SIZE)
+    parser.add_argument("-k", type=int, default=None, help="pieces in a row to win (default: size, at most 5)")
+    parser.add_argument("--depth", type=int, default=None,
+                        help="search depth before the heuristic takes over (default: full on 3x3, else 3)")
+    args = parser.parse_args()
+    k = args.k or min(args.size, 5)
+    depth = args.depth if args.depth is not None else (HEURISTIC_DEPTH if args.size == 3 else 3)
+
+    board = Board(args.size, k)
     print("Welcome to Tic-Tac-Toe!")
     print("You are 'X', the AI is 'O'.")
     print_board(board)
@@ -109,9 +440,9 @@ def main():
     while True:
         if current_player == HUMAN:
             try:
-                move = int(input("Enter your move (1-9): ")) - 1
-                if 0 <= move <= 8 and board[move] == EMPTY:
-                    board[move] = HUMAN
+                move = read_move(board)
+                if 0 <= move < len(board) and board[move] == EMPTY:
+                    board.place(move, HUMAN)
                     current_player = AI
                 else:
                     print("Invalid move. Please try again.")
@@ -121,9 +452,9 @@ def main():
                 continue
         else:
             print("AI is making a move...")
-            move = find_best_move(board)
+            move = find_best_move(board, depth)
             if move != -1:
-                board[move] = AI
+                board.place(move, AI)
                 current_player = HUMAN
         print_board(board)
         if check_winner(board, HUMAN):
@@ -1,7 +1,14 @@
+import argparse
 import math
-import tkinter as tk
-from tkinter import messagebox
 import time
+try:
+    import tkinter as tk
+    from tkinter import messagebox
+except ImportError:
+    # Headless installs only use the engine (see tournament.py).
+    tk = messagebox = None
+
+from background_search import BackgroundSearch, Ponder
 
 # A graphical Tic-Tac-Toe game with an unbeatable AI using Minimax
 # with Alpha-Beta Pruning.
@@ -13,7 +20,7 @@ AI_PLAYER = 'O'
 EMPTY = ' '
 
 class TicTacToe:
-    def __init__(self, master):
+    def __init__(self, master, ponder=True):
         self.master = master
         master.title("Tic-Tac-Toe")
         master.configure(bg="#f0f0f0")
@@ -29,6 +36,14 @@ class TicTacToe:
         self.buttons = []
         self.board_frame = tk.Frame(self.master)
         self.mode_frame = tk.Frame(self.master)
+        self.search = None
+        self.search_control = None
+        self.ponder_enabled = ponder
+        self.ponder = None
+        self.ponder_skipped = set()
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        master.protocol("WM_DELETE_WINDOW", self.close)
         
         self.show_mode_selection()
 
@@ -86,14 +101,20 @@ class TicTacToe:
         """
         Handles a button click. The logic depends on the game mode.
         """
+        if self.game_mode == "single_player" and self.current_player == AI_PLAYER:
+            return
         if self.board[index] == EMPTY and self.is_game_active:
             self.board[index] = self.current_player
             self.buttons[index].config(text=self.current_player, fg="#ff0000" if self.current_player == HUMAN_PLAYER_1 else "#0000ff")
+            reply = self.take_ponder(index)
             self.check_game_over()
             
             if self.is_game_active:
                 if self.game_mode == "single_player":
                     self.current_player = AI_PLAYER
+                    if reply is not None:
+                        self.finish_ai_move(reply)
+                        return
                     self.status_label.config(text="AI's turn (O)")
                     self.master.after(500, self.ai_move)
                 else:
@@ -102,10 +123,26 @@ class TicTacToe:
 
     def ai_move(self):
         """
-        Finds and executes the best move for the AI.
+        Starts the AI search on a worker thread; finish_ai_move plays the result.
+        """
+        if self.is_game_active and self.current_player == AI_PLAYER and self.search is None:
+            self.search_control = SearchControl()
+            self.search = BackgroundSearch(self.master, find_best_move, (list(self.board), self.search_control),
+                                           on_done=self.finish_ai_move, on_tick=self.show_thinking,
+                                           stop=self.search_control.cancel)
+
+    def show_thinking(self):
+        """
+        Shows a live node count while the AI searches.
+        """
+        self.status_label.config(text=f"AI thinking... {self.search_control.nodes:,} nodes")
+
+    def finish_ai_move(self, move):
         """
+        Executes the move found by the background search.
+        """
+        self.search = None
         if self.is_game_active:
-            move = find_best_move(self.board)
             if move != -1:
                 self.board[move] = AI_PLAYER
                 self.buttons[move].config(text=AI_PLAYER, fg="#0000ff")
@@ -113,7 +150,53 @@ class TicTacToe:
             self.check_game_over()
             if self.is_game_active:
                 self.current_player = HUMAN_PLAYER_1
-                self.status_label.config(text="Your turn (X)")
+                self.status_label.config(text=f"Your turn (X){self.ponder_summary()}")
+                self.start_pondering()
+
+    def start_pondering(self):
+        """
+        Searches the AI's answer to each of the human's replies while they
+        think; take_ponder collects it when the human clicks.
+        """
+        if not self.ponder_enabled or self.game_mode != "single_player":
+            return
+        self.ponder_skipped = set()
+        control = SearchControl()
+        tasks = []
+        for index in get_empty_cells(self.board):
+            board = list(self.board)
+            board[index] = HUMAN_PLAYER_1
+            if check_winner(board, HUMAN_PLAYER_1) or is_board_full(board):
+                self.ponder_skipped.add(index)  # nothing to answer
+                continue
+            tasks.append((index, find_best_move, (board, control)))
+        self.ponder = Ponder(tasks, control.cancel)
+
+    def take_ponder(self, index):
+        """
+        Stops pondering after the human played ``index`` and returns the
+        pondered reply, or None to search as usual.
+        """
+        if self.ponder is None:
+            return None
+        results = self.ponder.stop()
+        self.ponder = None
+        if index in self.ponder_skipped:
+            return None
+        reply = results.get(index)
+        if reply is None:
+            self.ponder_misses += 1
+        else:
+            self.ponder_hits += 1
+        return reply
+
+    def ponder_summary(self):
+        """
+        Ponder hit and miss counts for the status line.
+        """
+        if not self.ponder_enabled or not self.ponder_hits + self.ponder_misses:
+            return ""
+        return f" - ponder hits {self.ponder_hits}, misses {self.ponder_misses}"
 
     def check_game_over(self):
         """
@@ -137,10 +220,29 @@ class TicTacToe:
             messagebox.showinfo("Game Over", "It's a draw!")
             return
 
+    def cancel_search(self):
+        """
+        Abandons a running AI search and any pondering.
+        """
+        if self.search is not None:
+            self.search.cancel()
+            self.search = None
+        if self.ponder is not None:
+            self.ponder.stop()
+            self.ponder = None
+
+    def close(self):
+        """
+        Stops any running search before closing the window.
+        """
+        self.cancel_search()
+        self.master.destroy()
+
     def reset_game(self):
         """
         Resets the game state and board for a new game.
         """
+        self.cancel_search()
         self.board = [EMPTY] * 9
         self.is_game_active = True
         self.current_player = HUMAN_PLAYER_1
@@ -151,6 +253,28 @@ class TicTacToe:
         self.status_label.config(text=f"Player {self.current_player}'s turn")
         if self.game_mode == "single_player":
             self.status_label.config(text="Your turn (X)")
+            self.start_pondering()
+
+class SearchCancelled(Exception):
+    """
+    Raised inside minimax_alpha_beta when its SearchControl is cancelled.
+    """
+
+class SearchControl:
+    """
+    Node counter and cancel flag checked at every node of a search.
+    """
+    def __init__(self):
+        self.nodes = 0
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def tick(self):
+        self.nodes += 1
+        if self.cancelled:
+            raise SearchCancelled
 
 def get_empty_cells(board):
     """
@@ -181,13 +305,18 @@ def is_board_full(board):
     """
     return EMPTY not in board
 
-def minimax_alpha_beta(board, depth, is_maximizing, alpha, beta):
+def minimax_alpha_beta(board, depth, is_maximizing, alpha, beta, control=None):
     """
     The Minimax algorithm with Alpha-Beta pruning.
+
+    An optional SearchControl counts nodes and lets another thread cancel
+    the search.
     
     Returns:
         An integer representing the score of the board.
     """
+    if control is not None:
+        control.tick()
     if check_winner(board, AI_PLAYER):
         return 1
     if check_winner(board, HUMAN_PLAYER_1):
@@ -199,7 +328,7 @@ def minimax_alpha_beta(board, depth, is_maximizing, alpha, beta):
         best_score = -math.inf
         for cell_index in get_empty_cells(board):
             board[cell_index] = AI_PLAYER
-            score = minimax_alpha_beta(board, depth + 1, False, alpha, beta)
+            score = minimax_alpha_beta(board, depth + 1, False, alpha, beta, control)
             board[cell_index] = EMPTY
             best_score = max(best_score, score)
             alpha = max(alpha, best_score)
@@ -210,7 +339,7 @@ def minimax_alpha_beta(board, depth, is_maximizing, alpha, beta):
         best_score = math.inf
         for cell_index in get_empty_cells(board):
             board[cell_index] = HUMAN_PLAYER_1
-            score = minimax_alpha_beta(board, depth + 1, True, alpha, beta)
+            score = minimax_alpha_beta(board, depth + 1, True, alpha, beta, control)
             board[cell_index] = EMPTY
             best_score = min(best_score, score)
             beta = min(beta, best_score)
@@ -218,7 +347,20 @@ def minimax_alpha_beta(board, depth, is_maximizing, alpha, beta):
                 break
         return best_score
 
-def find_best_move(board):
+def find_best_move(board, control=None):
+    """
+    Finds the best move for the AI.
+
+    Looks the position up in MOVE_TABLE when it has been built and falls
+    back to a full search for positions the table does not cover.
+    """
+    if MOVE_TABLE is not None:
+        move = MOVE_TABLE[encode_board(board)]
+        if move != NO_MOVE:
+            return move
+    return search_best_move(board, control)
+
+def search_best_move(board, control=None):
     """
     Finds the best move for the AI using the minimax_alpha_beta function.
     """
@@ -227,7 +369,7 @@ def find_best_move(board):
     
     for cell_index in get_empty_cells(board):
         board[cell_index] = AI_PLAYER
-        score = minimax_alpha_beta(board, 0, False, -math.inf, math.inf)
+        score = minimax_alpha_beta(board, 0, False, -math.inf, math.inf, control)
         board[cell_index] = EMPTY
         
         if score > best_score:
@@ -236,7 +378,80 @@ def find_best_move(board):
             
     return best_move
 
+# Perfect-play table: MOVE_TABLE[encode_board(board)] is the move
+# search_best_move would pick for every position with O to move that is
+# reachable from an empty board (whoever moved first), or NO_MOVE elsewhere.
+# The two cases never share an encoding: O is to move after X opened when X
+# has one more piece, and after O opened when the counts are equal.
+# One byte per base-3 board encoding, 3**9 = 19683 bytes in total.
+NO_MOVE = 255
+CELL_CODES = {EMPTY: 0, HUMAN_PLAYER_1: 1, AI_PLAYER: 2}
+MOVE_TABLE = None
+
+def encode_board(board):
+    """
+    Returns the base-3 index of the board (cell i is digit i).
+    """
+    code = 0
+    for cell in reversed(board):
+        code = code * 3 + CELL_CODES[cell]
+    return code
+
+def build_move_table():
+    """
+    Solves every reachable position once and returns the move table.
+
+    Each child is scored exactly, as search_best_move does, and ties go to
+    the lowest cell index so the table picks the same moves as the search.
+    """
+    table = bytearray([NO_MOVE]) * 3 ** 9
+    values = {}
+
+    def solve(board, player):
+        # Value for O of ``board`` with ``player`` to move: 1, 0 or -1.
+        code = encode_board(board)
+        if (code, player) in values:
+            return values[code, player]
+        if check_winner(board, AI_PLAYER):
+            value = 1
+        elif check_winner(board, HUMAN_PLAYER_1):
+            value = -1
+        elif is_board_full(board):
+            value = 0
+        else:
+            other = HUMAN_PLAYER_1 if player == AI_PLAYER else AI_PLAYER
+            best_move = -1
+            best = -math.inf if player == AI_PLAYER else math.inf
+            for cell_index in get_empty_cells(board):
+                board[cell_index] = player
+                score = solve(board, other)
+                board[cell_index] = EMPTY
+                if (score > best) if player == AI_PLAYER else (score < best):
+                    best = score
+                    best_move = cell_index
+            value = best
+            if player == AI_PLAYER:
+                table[code] = best_move
+        values[code, player] = value
+        return value
+
+    solve([EMPTY] * 9, HUMAN_PLAYER_1)
+    solve([EMPTY] * 9, AI_PLAYER)
+    return table
+
+def init_move_table():
+    """
+    Builds MOVE_TABLE so find_best_move becomes a lookup.
+    """
+    global MOVE_TABLE
+    MOVE_TABLE = build_move_table()
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play tic-tac-toe against the computer or a friend.")
+    parser.add_argument("--no-ponder", dest="ponder", action="store_false",
+                        help="do not search during the human's turn")
+    args = parser.parse_args()
+    init_move_table()
     root = tk.Tk()
-    game = TicTacToe(root)
+    game = TicTacToe(root, args.ponder)
     root.mainloop()
@@ -0,0 +1,330 @@
+import argparse
+import json
+import math
+import os
+import random
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import count4
+import tic
+import ticmul
+from search_stats import instrument
+
+# Headless engine-vs-engine matches and speed benchmarks for the
+# tic-tac-toe and Connect Four engines.
+#
+# Engines are named by strings so worker processes can rebuild them:
+#
+#   tic:  random, tic-full, tic-d<N> (tic.py search, heuristic below depth N),
+#         ticmul (ticmul.py full minimax), ticmul-table (perfect-play table)
+#   c4:   random, c4-d<N> (count4.minimax at fixed depth N),
+#         c4-id<MS> (count4 iterative deepening with an MS-millisecond budget),
+#         c4-mcts<MS> (count4.MCTS with an MS-millisecond budget)
+#
+# Every engine is asked for a move from its own point of view: the board it
+# sees always has its stones as the AI's, whichever side it plays.  Games
+# alternate who moves first, and the first --random-plies moves of each game
+# are random (seeded per game) so deterministic engines play varied games.
+
+TIC_LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6)]
+
+# ----------- Engines -----------
+def _tic_view(cells, me):
+    # Board as seen by the engine playing ``me``: its stones are 'O'.
+    swap = {ticmul.AI_PLAYER: ticmul.HUMAN_PLAYER_1, ticmul.HUMAN_PLAYER_1: ticmul.AI_PLAYER}
+    return [cell if me == ticmul.AI_PLAYER or cell == ticmul.EMPTY else swap[cell] for cell in cells]
+
+def _tic_engine(name):
+    if name == "random":
+        return lambda cells, me, rng: (rng.choice(ticmul.get_empty_cells(cells)), None)
+    if name == "ticmul":
+        def choose(cells, me, rng):
+            control = ticmul.SearchControl()
+            return ticmul.search_best_move(_tic_view(cells, me), control), control.nodes
+        return choose
+    if name == "ticmul-table":
+        if ticmul.MOVE_TABLE is None:
+            ticmul.init_move_table()
+        return lambda cells, me, rng: (ticmul.find_best_move(_tic_view(cells, me)), None)
+    match = re.fullmatch(r"tic-(full|d(\d+))", name)
+    if match:
+        max_depth = int(match.group(2)) if match.group(2) else None
+        def choose(cells, me, rng):
+            board = tic.Board()
+            for i, cell in enumerate(_tic_view(cells, me)):
+                if cell != tic.EMPTY:
+                    board.place(i, cell)
+            return tic.find_best_move(board, max_depth), None
+        return choose
+    raise ValueError(f"unknown tic engine: {name}")
+
+def _c4_view(moves, me):
+    # Replays the game so the engine's stones are count4.AI.
+    board = count4.create_board()
+    piece = count4.AI if me == count4.PLAYER else count4.PLAYER
+    for col in moves:
+        board.play(col, piece)
+        piece = count4.AI if piece == count4.PLAYER else count4.PLAYER
+    return board
+
+def _c4_engine(name):
+    if name == "random":
+        return lambda moves, me, rng: (rng.choice(count4.get_valid_locations(_c4_view(moves, me))), None)
+    match = re.fullmatch(r"c4-d(\d+)", name)
+    if match:
+        depth = int(match.group(1))
+        ordering = count4.MoveOrdering()  # killers and history last the game
+        def choose(moves, me, rng):
+            budget = count4.SearchBudget()
+            ordering.new_search()
+            col, _ = count4.minimax(_c4_view(moves, me), depth, -math.inf, math.inf, True, None, budget, None,
+                                    ordering)
+            return col, budget.nodes
+        return choose
+    match = re.fullmatch(r"c4-id(\d+)", name)
+    if match:
+        time_limit = int(match.group(1)) / 1000
+        ordering = count4.MoveOrdering()
+        def choose(moves, me, rng):
+            budget = count4.SearchBudget(time_limit)
+            col, _, _ = count4.iterative_deepening(_c4_view(moves, me), table=count4.TranspositionTable(), budget=budget,
+                                                   ordering=ordering)
+            return col, budget.nodes
+        return choose
+    match = re.fullmatch(r"c4-mcts(\d+)", name)
+    if match:
+        time_limit = int(match.group(1)) / 1000
+        mcts = count4.MCTS(time_limit=time_limit)  # keeps its tree for the game
+        def choose(moves, me, rng):
+            mcts.rng.seed(rng.random())
+            col, _, playouts = mcts.search(_c4_view(moves, me))
+            return col, playouts
+        return choose
+    raise ValueError(f"unknown c4 engine: {name}")
+
+ENGINES = {"tic": _tic_engine, "c4": _c4_engine}
+
+def _engine_module(name):
+    # Module search_stats instruments for an engine, or None if it does not search.
+    if name.startswith("c4-mcts"):
+        return None  # no minimax tree to instrument
+    if name.startswith("c4-"):
+        return "count4"
+    if name.startswith("ticmul"):
+        return "ticmul"
+    if name.startswith("tic-"):
+        return "tic"
+    return None
+
+# ----------- Games -----------
+def _tic_game():
+    cells = [ticmul.EMPTY] * 9
+    def legal():
+        return ticmul.get_empty_cells(cells)
+    def play(move, side):
+        cells[move] = ticmul.HUMAN_PLAYER_1 if side == 0 else ticmul.AI_PLAYER
+    def winner():
+        for side, symbol in enumerate((ticmul.HUMAN_PLAYER_1, ticmul.AI_PLAYER)):
+            if any(all(cells[i] == symbol for i in line) for line in TIC_LINES):
+                return side
+        return None
+    def view(side):
+        return cells, ticmul.HUMAN_PLAYER_1 if side == 0 else ticmul.AI_PLAYER
+    return legal, play, winner, view
+
+def _c4_game():
+    board = count4.create_board()
+    moves = []
+    last = [None]
+    def legal():
+        return count4.get_valid_locations(board)
+    def play(move, side):
+        piece = count4.PLAYER if side == 0 else count4.AI
+        last[0] = (board.play(move, piece), move, piece)
+        moves.append(move)
+    def winner():
+        if last[0] is None:
+            return None
+        row, col, piece = last[0]
+        if count4.winning_move_at(board, row, col, piece):
+            return 0 if piece == count4.PLAYER else 1
+        return None
+    def view(side):
+        return moves, count4.PLAYER if side == 0 else count4.AI
+    return legal, play, winner, view
+
+GAMES = {"tic": _tic_game, "c4": _c4_game}
+
+def play_game(game, engine_a, engine_b, a_first, seed, random_plies=0, search_stats=False):
+    """Plays one game and returns a result dict.
+
+    ``winner`` is "a", "b" or None for a draw; ``stats`` maps each engine
+    label to its per-move times (seconds) and node counts (None when the
+    engine does not count nodes).  With ``search_stats`` every engine move
+    is run under search_stats.instrument and the records are returned in
+    ``search_stats``.
+    """
+    rng = random.Random(seed)
+    legal, play, winner, view = GAMES[game]()
+    labels = ("a", "b") if a_first else ("b", "a")
+    choosers = {"a": ENGINES[game](engine_a), "b": ENGINES[game](engine_b)}
+    stats = {"a": {"times": [], "nodes": []}, "b": {"times": [], "nodes": []}}
+    modules = {"a": _engine_module(engine_a), "b": _engine_module(engine_b)}
+    records = []
+    side = 0
+    ply = 0
+    while True:
+        moves = legal()
+        if not moves:
+            return {"winner": None, "stats": stats, "search_stats": records}
+        label = labels[side]
+        if ply < random_plies:
+            move = rng.choice(moves)
+        else:
+            state, me = view(side)
+            start = time.perf_counter()
+            if search_stats and modules[label]:
+                with instrument(modules[label], label=label) as recorded:
+                    move, nodes = choosers[label](state, me, rng)
+                records.append(dict(recorded.to_dict(), seed=seed, ply=ply))
+            else:
+                move, nodes = choosers[label](state, me, rng)
+            stats[label]["times"].append(time.perf_counter() - start)
+            stats[label]["nodes"].append(nodes)
+        play(move, side)
+        if winner() is not None:
+            return {"winner": label, "stats": stats, "search_stats": records}
+        side = 1 - side
+        ply += 1
+
+def _play_game_task(args):
+    return play_game(*args)
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (0 < pct <= 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+def run_match(game, engine_a, engine_b, games, workers=None, random_plies=0, seed=0, stats_log=None):
+    """Plays ``games`` games in a process pool and returns a summary dict.
+
+    With ``stats_log`` (a path) every engine move is instrumented and one
+    JSON line of search statistics per move is appended to the file.
+    """
+    tasks = [(game, engine_a, engine_b, n % 2 == 0, seed + n, random_plies, stats_log is not None)
+             for n in range(games)]
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_play_game_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_play_game_task, tasks, chunksize=max(1, games // (workers * 4))))
+    elapsed = time.perf_counter() - start
+
+    if stats_log is not None:
+        names = {"a": engine_a, "b": engine_b}
+        with open(stats_log, "a", encoding="utf-8") as f:
+            for r in results:
+                for record in r["search_stats"]:
+                    f.write(json.dumps(dict(record, name=names[record["label"]])) + "\n")
+
+    summary = {
+        "game": game, "games": games, "seconds": elapsed,
+        "a_wins": sum(1 for r in results if r["winner"] == "a"),
+        "draws": sum(1 for r in results if r["winner"] is None),
+        "b_wins": sum(1 for r in results if r["winner"] == "b"),
+        "engines": {},
+    }
+    for label, name in (("a", engine_a), ("b", engine_b)):
+        times = [t for r in results for t in r["stats"][label]["times"]]
+        nodes = [n for r in results for n in r["stats"][label]["nodes"]]
+        counted = None not in nodes and nodes
+        summary["engines"][label] = {
+            "name": name,
+            "moves": len(times),
+            "p50": percentile(times, 50),
+            "p90": percentile(times, 90),
+            "p99": percentile(times, 99),
+            "max": max(times, default=0.0),
+            "nodes_per_sec": sum(nodes) / sum(times) if counted and sum(times) else None,
+        }
+    return summary
+
+# ----------- Benchmarks -----------
+# Fixed positions: tic cell strings (X moved first) and Connect Four column
+# sequences (player moved first).  Each engine picks a move in every one.
+BENCH_SUITES = {
+    "tic": ["    X    ", "X        ", "X   O   X", " X  O    ", "XO  X    ", "X O OX  X"],
+    "c4": [[], [3], [3, 3, 2], [3, 2, 4, 4, 2], [3, 3, 3, 4, 2, 2, 4], [0, 6, 3, 3, 4, 2, 2, 4, 5],
+           [3, 3, 3, 3, 2, 4, 2, 2, 4, 4, 1], [2, 3, 3, 4, 4, 5, 4, 5, 5, 6, 6, 0, 6]],
+}
+
+def _bench_states(game):
+    for position in BENCH_SUITES[game]:
+        if game == "tic":
+            cells = list(position)
+            yield cells, ticmul.AI_PLAYER if cells.count("X") > cells.count("O") else ticmul.HUMAN_PLAYER_1
+        else:
+            yield position, count4.AI if len(position) % 2 else count4.PLAYER
+
+def benchmark(game, engine, repeat=3):
+    """Runs ``engine`` over the fixed suite ``repeat`` times and returns
+    ``(positions_per_sec, nodes_per_sec or None)``."""
+    choose = ENGINES[game](engine)
+    rng = random.Random(0)
+    states = list(_bench_states(game))
+    positions = 0
+    nodes = 0
+    counted = True
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for state, me in states:
+            _, n = choose(list(state), me, rng)
+            positions += 1
+            if n is None:
+                counted = False
+            else:
+                nodes += n
+    elapsed = time.perf_counter() - start
+    return positions / elapsed, (nodes / elapsed if counted else None)
+
+def _format_rate(value):
+    return "n/a" if value is None else f"{value:,.0f}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless engine-vs-engine tournaments and benchmarks.")
+    parser.add_argument("game", choices=sorted(GAMES))
+    parser.add_argument("engines", nargs="+", help="two engines to match, or any number with --bench")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--random-plies", type=int, default=None,
+                        help="random opening moves per game (default: 1 for tic, 2 for c4)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bench", action="store_true", help="benchmark engines on the fixed position suite")
+    parser.add_argument("--stats-log", metavar="FILE",
+                        help="append per-move search statistics (JSON lines) to FILE")
+    args = parser.parse_args()
+
+    if args.bench:
+        print("engine            positions/s      nodes/s")
+        for engine in args.engines:
+            positions_per_sec, nodes_per_sec = benchmark(args.game, engine)
+            print(f"{engine:16s} {positions_per_sec:12,.1f} {_format_rate(nodes_per_sec):>12s}")
+    else:
+        if len(args.engines) != 2:
+            parser.error("a match needs exactly two engines")
+        random_plies = args.random_plies if args.random_plies is not None else (1 if args.game == "tic" else 2)
+        summary = run_match(args.game, args.engines[0], args.engines[1], args.games,
+                            args.workers, random_plies, args.seed, args.stats_log)
+        a, b = summary["engines"]["a"], summary["engines"]["b"]
+        print(f"{a['name']} vs {b['name']}: {summary['games']} games in {summary['seconds']:.1f}s")
+        print(f"  {a['name']} wins {summary['a_wins']}, draws {summary['draws']}, {b['name']} wins {summary['b_wins']}")
+        print("  engine            moves    p50 ms    p90 ms    p99 ms    max ms      nodes/s")
+        for stats in (a, b):
+            print(f"  {stats['name']:16s} {stats['moves']:6d} {stats['p50'] * 1000:9.2f} {stats['p90'] * 1000:9.2f}"
+                  f" {stats['p99'] * 1000:9.2f} {stats['max'] * 1000:9.2f} {_format_rate(stats['nodes_per_sec']):>12s}")